@@ -10,7 +10,7 @@
 from sympy.printing.fortran import fcode
 from sympy import Integer, Float
 
-def fortran_d0_lines(names, exprs, value_range=range(-100, 101), indent=6):
+def fortran_d0_lines(names, exprs, value_range=range(-100, 101), indent=6, source_format='free'):
     """
     Convert symbolic expressions to Fortran assignment lines with .D0 double precision literals.
     
@@ -19,6 +19,8 @@ def fortran_d0_lines(names, exprs, value_range=range(-100, 101), indent=6):
         exprs: list of sympy expressions
         value_range: range of integers to promote (default -100 to 100)
         indent: number of spaces to prefix each line
+        source_format: 'free' or 'fixed', fixed-form lines are continued with
+                       a character in column 6 and can be nested in any block
         
     Returns:
         A multiline Fortran code string
@@ -27,6 +29,13 @@ def fortran_d0_lines(names, exprs, value_range=range(-100, 101), indent=6):
     subs_map = {Integer(n): Float(n, 64) for n in value_range}
     promoted_exprs = [expr.xreplace(subs_map) for expr in exprs]
     
+    # Generate fixed-form lines, long expressions are wrapped by fcode
+    if source_format == 'fixed':
+        return "\n".join(
+            fcode(expr, assign_to=name, source_format='fixed', standard=95)
+            for name, expr in zip(names, promoted_exprs)
+        )
+
     # Generate clean Fortran code lines
     d_line = "\n".join(
         f"		 {name:<5} = {fcode(expr, assign_to=None, source_format='free', standard=95)}"
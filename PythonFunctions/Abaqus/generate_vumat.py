@@ -9,13 +9,20 @@
 
 ## -------- ABAQUS INPUT FORMATTING --------------- ##
 from pathlib import Path
+import sympy as sp
 from PythonFunctions.Abaqus.fortran_formatting import fortran_d0_lines
+from PythonFunctions.Abaqus.tabulated_derivatives import TabulatedDerivativeLines
 
 def GenerateVumatHyperelasticity(StrainEnergyDensity,
                                  MaterialPropsParam,
                                  StrainEnergyDerivativeExprs,
                                  StrainEnergyDerivativeNames,
-                                 template_name = 'VUMAT_2D_planestrain_template.f'):
+                                 template_name = 'VUMAT_2D_planestrain_template.f',
+                                 output_path = None,
+                                 extra_replacements = None,
+                                 derivative_lines = None,
+                                 declaration_lines = None,
+                                 material_lines = None):
   
     ## Set main path
     main_path = "PythonFunctions\\Abaqus\\templates\\"
@@ -27,7 +34,9 @@ def GenerateVumatHyperelasticity(StrainEnergyDensity,
     template_path = Path(main_path + template_name)
       
     ## Set output path
-    output_path = Path("output\\"+output_name)
+    if output_path is None:
+        output_path = Path("output\\"+output_name)
+    output_path = Path(output_path)
     
     ## Set identifiers for input text
     ID_1 = "*** INPUT FROM PYTHON PROGRAM *** STRAIN ENERGY DEFINITION"
@@ -43,10 +52,13 @@ def GenerateVumatHyperelasticity(StrainEnergyDensity,
     W_line = 'W = ' + str(StrainEnergyDensity)
     
     ## Set strain energy parameter properties for input
-    M_line = "\n".join(
-        f"      {param:<3} = props({i+1})"
-        for i, param in enumerate(MaterialPropsParam)
-    )
+    if material_lines is None:
+        M_line = "\n".join(
+            f"      {param:<3} = props({i+1})"
+            for i, param in enumerate(MaterialPropsParam)
+        )
+    else:
+        M_line = material_lines
     
     ## Set elastic material parameter properties for input
     P_line = ",".join(
@@ -57,18 +69,163 @@ def GenerateVumatHyperelasticity(StrainEnergyDensity,
     ## Add The badass real 8 baby !!!
     P_line = '	  ' + 'Real*8' + P_line
     
+    ## Add additional declarations, e.g. derivative tables
+    if declaration_lines is not None:
+        P_line = P_line + "\n" + declaration_lines
+    
     ## Set partial derivative of the strain energy w. respect to the invariatns
-    D_line = fortran_d0_lines(StrainEnergyDerivativeNames,
-                              StrainEnergyDerivativeExprs)
+    if derivative_lines is None:
+        D_line = fortran_d0_lines(StrainEnergyDerivativeNames,
+                                  StrainEnergyDerivativeExprs)
+    else:
+        D_line = derivative_lines
         
     ## Replace Identifiers with the appropriate definitions
     output = output.replace(ID_1,W_line,1)
     output = output.replace(ID_2,M_line,1)
     output = output.replace(ID_3,D_line,1)
     output = output.replace(ID_4,P_line,1)
+    
+    ## Replace template specific identifiers
+    for ID, line in (extra_replacements or {}).items():
+        output = output.replace(ID,line,1)
       
     ## Write to output
     with output_path.open("w", encoding="utf-8") as f:
         f.write(output)
 
-    return print('Fortran file generated and saved to output')
+    print('Fortran file generated and saved to output')
+    
+    return output_path
+
+
+
+def GenerateVumatViscoHyperelasticity(StrainEnergyDensity,
+                                      MaterialPropsParam,
+                                      StrainEnergyDerivativeExprs,
+                                      StrainEnergyDerivativeNames,
+                                      NumberPronyTerms,
+                                      template_name = 'VUMAT_2D_planestrain_visco_template.f',
+                                      output_path = None):
+    
+    ## Set identifiers for the Prony series input text
+    ID_5 = "C 	  *** INPUT FROM PYTHON PROGRAM *** PRONY DECLARATION"
+    ID_6 = "C 	  *** INPUT FROM PYTHON PROGRAM *** PRONY PARAMETERS"
+    
+    ## Declare the number of Prony terms and the Prony arrays
+    N_line = "\n".join([
+        "      INTEGER NPRONY",
+        f"      PARAMETER (NPRONY = {NumberPronyTerms})",
+        "      REAL*8 gP(NPRONY), tauP(NPRONY), eP(NPRONY), fP(NPRONY)"])
+    
+    ## The Prony parameters follow the material parameters in props,
+    ## g_1..g_n first and tau_1..tau_n second
+    offset = len(MaterialPropsParam)
+    G_line = "\n".join(
+        f"      gP({i+1})   = props({offset+i+1})"
+        for i in range(NumberPronyTerms)
+    )
+    T_line = "\n".join(
+        f"      tauP({i+1}) = props({offset+NumberPronyTerms+i+1})"
+        for i in range(NumberPronyTerms)
+    )
+    
+    ## Fixed-form derivative lines, long (e.g. exponential) expressions are
+    ## continued in column 6 as required by the template
+    D_line = fortran_d0_lines(StrainEnergyDerivativeNames,
+                              StrainEnergyDerivativeExprs,
+                              source_format = 'fixed')
+    
+    return GenerateVumatHyperelasticity(StrainEnergyDensity,
+                                        MaterialPropsParam,
+                                        StrainEnergyDerivativeExprs,
+                                        StrainEnergyDerivativeNames,
+                                        template_name = template_name,
+                                        output_path = output_path,
+                                        derivative_lines = D_line,
+                                        extra_replacements = {ID_5: N_line,
+                                                              ID_6: G_line + "\n" + T_line})
+
+
+def GenerateVumatHyperelasticityTabulated(StrainEnergyDensity,
+                                          MaterialPropsParam,
+                                          StrainEnergyDerivativeExprs,
+                                          StrainEnergyDerivativeNames,
+                                          ParamSymbols,
+                                          ParamValues,
+                                          InvariantSymbols,
+                                          InvariantRanges,
+                                          n_segments = 64,
+                                          template_name = 'VUMAT_2D_planestrain_template.f',
+                                          output_path = None):
+    
+    ## Tabulate the derivatives at the calibrated parameters
+    D_line, T_line, report = TabulatedDerivativeLines(StrainEnergyDerivativeNames,
+                                                      StrainEnergyDerivativeExprs,
+                                                      ParamSymbols,
+                                                      ParamValues,
+                                                      InvariantSymbols,
+                                                      InvariantRanges,
+                                                      n_segments = n_segments)
+    
+    ## The tables are only valid for the calibrated parameters. Hard-code them
+    ## so that the tables, the closed-form fallback and the stress use the same
+    ## model, props of these parameters are ignored
+    values = {str(param): value for param, value in zip(ParamSymbols, ParamValues)}
+    M_line = "\n".join(
+        ["C     CALIBRATED PARAMETERS OF THE TABULATED DERIVATIVES, PROPS IGNORED"] +
+        [f"      {param:<3} = " + f"{float(values[param]):.16E}".replace('E', 'D')
+         if param in values else f"      {param:<3} = props({i+1})"
+         for i, param in enumerate(map(str, MaterialPropsParam))]
+    )
+    
+    ## Report the interpolation error against the symbolic model
+    print('Tabulated strain-energy derivatives:')
+    for name, entry in report.items():
+        if entry['tabulated']:
+            print(f"  {name:<6} in {entry['variable']} [{entry['range'][0]:.4g}, {entry['range'][1]:.4g}], "
+                  f"max abs error {entry['max_abs_error']:.3e}, max rel error {entry['max_rel_error']:.3e}")
+        else:
+            print(f"  {name:<6} closed form ({entry['reason']})")
+    
+    ## Generate VUMAT with the tables and the table lookups
+    output_path = GenerateVumatHyperelasticity(StrainEnergyDensity,
+                                               MaterialPropsParam,
+                                               StrainEnergyDerivativeExprs,
+                                               StrainEnergyDerivativeNames,
+                                               template_name = template_name,
+                                               output_path = output_path,
+                                               derivative_lines = D_line,
+                                               declaration_lines = T_line,
+                                               material_lines = M_line)
+    
+    return output_path, report
+
+
+def GenerateVumatHyperelasticityVectorized(StrainEnergyDensity,
+                                           MaterialPropsParam,
+                                           StrainEnergyDerivativeExprs,
+                                           StrainEnergyDerivativeNames,
+                                           InvariantSymbols,
+                                           template_name = 'VUMAT_3D_template.f',
+                                           output_path = None):
+    
+    ## The block-vectorized templates (3D, plane stress) store the invariants
+    ## and derivatives in nblock arrays, index them with the material point k.
+    ## Plain symbols named e.g. I1b(k) print as array elements
+    indexed = {symbol: sp.Symbol(f"{symbol}(k)") for symbol in InvariantSymbols}
+    
+    ## Set partial derivative of the strain energy w. respect to the invariatns,
+    ## in fixed form so that long (e.g. exponential) expressions are continued
+    ## in column 6 as required by the templates
+    D_line = fortran_d0_lines([f"{name}(k)" for name in StrainEnergyDerivativeNames],
+                              [expr.xreplace(indexed) for expr in StrainEnergyDerivativeExprs],
+                              source_format = 'fixed')
+    
+    return GenerateVumatHyperelasticity(StrainEnergyDensity,
+                                        MaterialPropsParam,
+                                        StrainEnergyDerivativeExprs,
+                                        StrainEnergyDerivativeNames,
+                                        template_name = template_name,
+                                        output_path = output_path,
+                                        derivative_lines = D_line)
\ No newline at end of file
@@ -0,0 +1,192 @@
+##############################################################################
+##
+## Author:      Jamie E. Simon
+##
+## Description: Tabulation of the strain-energy derivatives for the VUMAT.
+##              Derivatives that depend on a single invariant are sampled
+##              over the calibrated invariant range and replaced by a
+##              piecewise cubic spline evaluated with a table lookup, with
+##              the closed form as fallback outside the tabulated range.
+##
+##############################################################################
+
+## Import packages
+import numpy as np
+from sympy import lambdify
+from scipy.interpolate import CubicSpline
+from PythonFunctions.Abaqus.fortran_formatting import fortran_d0_lines
+from PythonFunctions.StretchDescription.stretches_invariants import InvariantsNumerical
+
+
+def TabulationRanges(Xi, nu = 0.5, margin = 0.25, min_width = 1e-2):
+    """
+    Computes the invariant ranges (I1b, I2b, J) covered by a uniaxial test,
+    widened by a margin so that the table also covers moderate excursions.
+
+    Parameters:
+        Xi: nominal strain data
+        nu: poisson's ratio used for the lateral stretches
+        margin: relative widening of each range
+        min_width: absolute widening, keeps nearly constant invariants (J) tabulated
+
+    Returns:
+        A list of (lower, upper) bounds for I1b, I2b and J
+    """
+    # Stretches over the tested strain range
+    lam2 = 1.0 + np.linspace(np.min(Xi), np.max(Xi), num=200)
+    lam1 = lam2**(-nu)
+    I1b, I2b, Jac, _, _ = InvariantsNumerical(lam1, lam2, lam1)
+
+    # Widen every range
+    ranges = []
+    for values in (I1b, I2b, Jac):
+        lo, hi = np.min(values), np.max(values)
+        pad = margin * (hi - lo) + min_width
+        ranges.append((lo - pad, hi + pad))
+
+    return ranges
+
+
+def TabulateDerivative(function, lower, upper, n_segments = 64, n_check = 16):
+    """
+    Fits a cubic spline with uniform segments to a function of one variable.
+
+    Parameters:
+        function: callable of one variable
+        lower, upper: tabulated range
+        n_segments: number of spline segments
+        n_check: number of points per segment used to measure the error
+
+    Returns:
+        coefficients: (n_segments, 4) polynomial coefficients in the local
+                      coordinate s = (x - x_i)/h of each segment
+        max_abs_error, max_rel_error: interpolation error against the function
+    """
+    # Sample the function on the knots
+    x = np.linspace(lower, upper, num=n_segments + 1)
+    f = np.broadcast_to(function(x), x.shape).astype(float)
+    if not np.all(np.isfinite(f)):
+        raise ValueError(f"Derivative is not finite on the range [{lower}, {upper}]")
+    spline = CubicSpline(x, f)
+
+    # Convert the coefficients of (x - x_i)**(3-k) to powers of s
+    h = x[1] - x[0]
+    coefficients = np.stack([spline.c[3 - m] * h**m for m in range(4)], axis=1)
+
+    # Measure the interpolation error between the knots
+    xc = np.linspace(lower, upper, num=n_segments * n_check + 1)
+    fc = np.broadcast_to(function(xc), xc.shape)
+    error = np.abs(spline(xc) - fc)
+    max_abs_error = float(np.max(error))
+    max_rel_error = max_abs_error / max(float(np.max(np.abs(fc))), np.finfo(float).tiny)
+
+    return coefficients, max_abs_error, max_rel_error
+
+
+def fortran_table_lines(table_name, coefficients):
+    """
+    Declares a coefficient table and fills it with one DATA statement per segment.
+
+    Returns:
+        A multiline fixed-form Fortran code string
+    """
+    n_segments = len(coefficients)
+    lines = [f"      REAL*8 {table_name}(4,{n_segments})"]
+    for i, row in enumerate(coefficients):
+        values = [f"{value:.16E}".replace('E', 'D') for value in row]
+        lines.append(f"      DATA ({table_name}(jT,{i+1}),jT=1,4) /")
+        lines.append(f"     &  {values[0]}, {values[1]},")
+        lines.append(f"     &  {values[2]}, {values[3]}/")
+    return "\n".join(lines)
+
+
+def fortran_lookup_lines(name, table_name, variable, lower, upper, n_segments, exact_line):
+    """
+    Evaluates a tabulated derivative with a segment lookup and Horner's rule,
+    falling back to the closed form outside the tabulated range.
+
+    Returns:
+        A multiline fixed-form Fortran code string
+    """
+    scale = n_segments / (upper - lower)
+    lower_d = f"{lower:.16E}".replace('E', 'D')
+    scale_d = f"{scale:.16E}".replace('E', 'D')
+    return "\n".join([
+        f"C        {name} TABULATED IN {variable}, CUBIC SPLINE WITH {n_segments} SEGMENTS",
+        f"         xT = ({variable} - ({lower_d}))",
+        f"     &        * {scale_d}",
+        f"         IF (xT.GE.0.d0 .AND. xT.LE.{n_segments}.d0) THEN",
+        f"            iT = MIN(INT(xT), {n_segments - 1}) + 1",
+        f"            sT = xT - DBLE(iT - 1)",
+        f"            {name} = {table_name}(1,iT) + sT*({table_name}(2,iT)",
+        f"     &           + sT*({table_name}(3,iT) + sT*{table_name}(4,iT)))",
+        f"         ELSE",
+        exact_line,
+        f"         END IF",
+    ])
+
+
+def TabulatedDerivativeLines(names, exprs, param_symbols, param_values,
+                             invariant_symbols, invariant_ranges,
+                             n_segments = 64):
+    """
+    Creates the VUMAT code of the strain-energy derivatives where every
+    non-polynomial derivative depending on a single invariant is tabulated
+    at the calibrated parameters. Derivatives that are constant, polynomial
+    (cheaper than a table lookup) or depend on several invariants keep their
+    closed form. The tables are only valid for param_values, so the VUMAT
+    has to use the same constants (see GenerateVumatHyperelasticityTabulated).
+
+    Parameters:
+        names: list of derivative names (strings), e.g. ['dWdI1','dWdI2','dWdJ']
+        exprs: list of sympy derivative expressions
+        param_symbols: list of sympy parameter symbols
+        param_values: calibrated parameter values
+        invariant_symbols: sympy symbols of (I1b, I2b, J), named as in the template
+        invariant_ranges: list of (lower, upper) bounds of each invariant
+        n_segments: number of spline segments per table
+
+    Returns:
+        D_line: derivative evaluation code for the material point loop
+        T_line: declarations and DATA statements of the tables
+        report: per derivative, whether it is tabulated and its interpolation error
+    """
+    values = dict(zip(param_symbols, param_values))
+    D_lines, T_lines, report = [], ["      REAL*8 xT, sT", "      INTEGER iT, jT"], {}
+
+    for name, expr in zip(names, exprs):
+        # Closed form, used as is or as fallback, in fixed form so that long
+        # (transcendental) expressions are continued correctly
+        exact_line = fortran_d0_lines([name], [expr], source_format='fixed')
+
+        # Invariants the derivative depends on at the calibrated parameters
+        expr_num = expr.subs(values)
+        variables = [s for s in invariant_symbols if s in expr_num.free_symbols]
+        if len(variables) != 1:
+            reason = 'constant' if not variables else 'depends on ' + ', '.join(map(str, variables))
+            report[name] = {'tabulated': False, 'reason': reason}
+            D_lines.append(exact_line)
+            continue
+
+        # Polynomials take fewer operations than the lookup
+        if expr_num.is_polynomial(variables[0]):
+            report[name] = {'tabulated': False, 'reason': 'polynomial'}
+            D_lines.append(exact_line)
+            continue
+
+        # Tabulate over the range of the invariant
+        variable = variables[0]
+        lower, upper = invariant_ranges[list(invariant_symbols).index(variable)]
+        coefficients, max_abs_error, max_rel_error = TabulateDerivative(
+            lambdify(variable, expr_num, modules='numpy'), lower, upper, n_segments)
+
+        table_name = 'T' + name
+        T_lines.append(fortran_table_lines(table_name, coefficients))
+        D_lines.append(fortran_lookup_lines(name, table_name, str(variable),
+                                            lower, upper, n_segments, exact_line))
+        report[name] = {'tabulated': True, 'variable': str(variable),
+                        'range': (lower, upper),
+                        'max_abs_error': max_abs_error,
+                        'max_rel_error': max_rel_error}
+
+    return "\n".join(D_lines), "\n".join(T_lines), report
@@ -0,0 +1,215 @@
+C *******************************************************************
+C  VUMAT (2D plane stress, block-vectorized)
+C     
+C  ---------------------------------------------------
+C  Authors:  Jamie Simon
+C  Date:     2024-05-10
+C  E-mail:   ...
+C  Source:   
+C *******************************************************************
+C
+C  Strain-energy function:
+C
+C  *** INPUT FROM PYTHON PROGRAM *** STRAIN ENERGY DEFINITION
+C
+C  Description: The thickness stretch L3 is solved locally such that
+C               sigma_33 = 0 with a secant iteration, vectorized over
+C               the block of material points. The invariants, the
+C               derivatives of the strain-energy function and the
+C               stresses are computed in separate passes over nblock
+C               arrays, which compilers can vectorize (SIMD).
+C
+C               stretchNew(k,1..3) = U11, U22, U12
+C
+C  State variables (nstatev >= 1):
+C               1    thickness stretch L3 of the last increment
+C
+C *******************************************************************
+C
+      subroutine vumat(
+     & nblock, ndir, nshr, nstatev, nfieldv, nprops, lanneal,
+     & stepTime, totalTime, dt, cmname, coordMp, charLength,
+     & props, density, strainInc, relSpinInc,
+     & tempOld, stretchOld, defgradOld, fieldOld,
+     & stressOld, stateOld, enerInternOld, enerInelasOld,
+     & tempNew, stretchNew, defgradNew, fieldNew,
+     & stressNew, stateNew, enerInternNew, enerInelasNew )
+C
+      INCLUDE 'vaba_param.inc'
+C
+      dimension props(nprops), density(nblock), coordMp(nblock,*),
+     & charLength(nblock), strainInc(nblock,ndir+nshr),
+     & relSpinInc(nblock,nshr), tempOld(nblock),
+     & stretchOld(nblock,ndir+nshr),
+     & defgradOld(nblock,ndir+nshr+nshr),
+     & fieldOld(nblock,nfieldv), stressOld(nblock,ndir+nshr),
+     & stateOld(nblock,nstatev), enerInternOld(nblock),
+     & enerInelasOld(nblock), tempNew(nblock),
+     & stretchNew(nblock,ndir+nshr),
+     & defgradNew(nblock,ndir+nshr+nshr),
+     & fieldNew(nblock,nfieldv),
+     & stressNew(nblock,ndir+nshr), stateNew(nblock,nstatev),
+     & enerInternNew(nblock), enerInelasNew(nblock)
+C
+      CHARACTER*80 cmname
+C
+C     LOCAL VARIABLES
+C     ---------------
+C 	  *** INPUT FROM PYTHON PROGRAM *** MATERIAL INITIATION
+      REAL*8 G1, k1, trace, u1, Jm23, den, L3n
+      REAL*8 B11(nblock), B22(nblock), B33(nblock), B12(nblock)
+      REAL*8 I1b(nblock), I2b(nblock), detJ(nblock)
+      REAL*8 dWdI1(nblock), dWdI2(nblock), dWdJ(nblock)
+      REAL*8 p1(nblock), p2(nblock), p3(nblock)
+      REAL*8 S11(nblock), S22(nblock), S12(nblock), S33(nblock)
+      REAL*8 L3(nblock), L3p(nblock), S33p(nblock)
+      INTEGER k, iT, NITER
+      PARAMETER (NITER = 12)
+C
+C     MATERIAL PARAMETERS
+C     ----------------------------------------------------------------
+C 	  *** INPUT FROM PYTHON PROGRAM *** MATERIAL PARAMETERS
+C
+C     COMPUTE SHEAR AND KAPPA MODULUS
+C     ----------------------------------------------------------------
+      G1 = E/(2.d0*(1.d0 + nu))
+      k1 = E/(3.d0*(1.d0 - 2.d0*nu))
+C
+C     ***************************************************************
+C     ------------ INITIALIZE MATERIAL AS LINEARLY ELASTIC ----------
+C      sigma_ij = 2*G1*(epsilon_ij + nu/(1-nu) delta_ij*epsilon_kk)
+C     ***************************************************************
+C
+      IF (totalTime.EQ.0.0) THEN
+         DO k = 1,nblock
+            trace = strainInc(k,1) + strainInc(k,2)
+            stressNew(k,1) = stressOld(k,1) + 2.d0*G1*(strainInc(k,1)
+     &                     + nu/(1.d0 - nu)*trace)
+            stressNew(k,2) = stressOld(k,2) + 2.d0*G1*(strainInc(k,2)
+     &                     + nu/(1.d0 - nu)*trace)
+            stressNew(k,3) = stressOld(k,3) + 2.d0*G1*strainInc(k,3)
+            stateNew(k,1) = 1.d0
+         END DO
+C
+      ELSE
+C
+C     ***************************************************************
+C     ------------ INITIAL GUESS OF THE THICKNESS STRETCH -----------
+C      last converged L3, or the incompressible estimate
+C     ***************************************************************
+C
+      DO k = 1,nblock
+         IF (stateOld(k,1).GT.0.d0) THEN
+            L3(k) = stateOld(k,1)
+         ELSE
+            L3(k) = 1.d0/(stretchNew(k,1)*stretchNew(k,2)
+     &                  - stretchNew(k,3)*stretchNew(k,3))
+         END IF
+      END DO
+C
+C     ***************************************************************
+C     ------------ SECANT ITERATION FOR sigma_33 = 0 ----------------
+C     ***************************************************************
+C
+      DO iT = 0,NITER
+C
+C        PASS 1: LEFT CAUCHY-GREEN TENSOR AND J WITH THE CURRENT L3
+C        ------------------------------------------------------------
+         DO k = 1,nblock
+            B11(k) = stretchNew(k,1)*stretchNew(k,1)
+     &             + stretchNew(k,3)*stretchNew(k,3)
+            B22(k) = stretchNew(k,3)*stretchNew(k,3)
+     &             + stretchNew(k,2)*stretchNew(k,2)
+            B12(k) = stretchNew(k,1)*stretchNew(k,3)
+     &             + stretchNew(k,3)*stretchNew(k,2)
+            B33(k) = L3(k)*L3(k)
+            detJ(k) = L3(k)*(stretchNew(k,1)*stretchNew(k,2)
+     &                     - stretchNew(k,3)*stretchNew(k,3))
+         END DO
+C
+C        PASS 2: MODIFIED TENSOR AND INVARIANTS
+C        ------------------------------------------------------------
+         DO k = 1,nblock
+            Jm23 = detJ(k)**(-2.d0/3.d0)
+            B11(k) = Jm23*B11(k)
+            B22(k) = Jm23*B22(k)
+            B33(k) = Jm23*B33(k)
+            B12(k) = Jm23*B12(k)
+            I1b(k) = B11(k) + B22(k) + B33(k)
+            I2b(k) = 0.5d0*(I1b(k)*I1b(k)
+     &             - (B11(k)*B11(k) + B22(k)*B22(k) + B33(k)*B33(k)
+     &             + 2.d0*B12(k)*B12(k)))
+         END DO
+C
+C        PASS 3: DERIVATIVES OF STRAIN-ENERGY FUNCTION
+C        ------------------------------------------------------------
+         DO k = 1,nblock
+C		 *** INPUT FROM PYTHON PROGRAM *** DERIVATIVE OF STRAIN-ENERGY FUNCTION
+         END DO
+C
+C        PASS 4: COROTATIONAL STRESS
+C        ------------------------------------------------------------
+         DO k = 1,nblock
+            p1(k) = (2.d0/detJ(k))*(dWdI1(k) + dWdI2(k)*I1b(k))
+            p2(k) = (2.d0/detJ(k))*dWdI2(k)
+            p3(k) = dWdJ(k) - (2.d0*I1b(k))/(3.d0*detJ(k))*dWdI1(k)
+     &            - (4.d0*I2b(k))/(3.d0*detJ(k))*dWdI2(k)
+            S11(k) = p1(k)*B11(k) + p3(k)
+     &             - p2(k)*(B11(k)*B11(k) + B12(k)*B12(k))
+            S22(k) = p1(k)*B22(k) + p3(k)
+     &             - p2(k)*(B12(k)*B12(k) + B22(k)*B22(k))
+            S12(k) = p1(k)*B12(k)
+     &             - p2(k)*(B11(k)*B12(k) + B12(k)*B22(k))
+            S33(k) = p1(k)*B33(k) + p3(k) - p2(k)*B33(k)*B33(k)
+         END DO
+C
+C        PASS 5: SECANT UPDATE OF THE THICKNESS STRETCH
+C        ------------------------------------------------------------
+         IF (iT.EQ.0) THEN
+            DO k = 1,nblock
+               L3p(k)  = L3(k)
+               S33p(k) = S33(k)
+               L3(k)   = L3(k)*(1.d0 + 1.d-4)
+            END DO
+         ELSE IF (iT.LT.NITER) THEN
+            DO k = 1,nblock
+               den = S33(k) - S33p(k)
+               L3n = L3(k)
+               IF (ABS(den).GT.1.d-300) THEN
+                  L3n = L3(k) - S33(k)*(L3(k) - L3p(k))/den
+               END IF
+               L3p(k)  = L3(k)
+               S33p(k) = S33(k)
+               L3(k)   = MIN(MAX(L3n, 0.5d0*L3(k)), 2.d0*L3(k))
+            END DO
+         END IF
+C
+      END DO
+C
+C     ***************************************************************
+C     ------------ STORE STRESS AND THICKNESS STRETCH ---------------
+C     ***************************************************************
+C
+      DO k = 1,nblock
+         stressNew(k,1) = S11(k)
+         stressNew(k,2) = S22(k)
+         stressNew(k,3) = S12(k)
+         stateNew(k,1)  = L3(k)
+      END DO
+C
+C     ***************************************************************
+C     ------------ SPECIFIC INTERNAL ENERGY --------------------------
+C     ***************************************************************
+C
+      DO k = 1,nblock
+         u1 = 0.5d0*( (stressOld(k,1) + stressNew(k,1))*strainInc(k,1)
+     &              + (stressOld(k,2) + stressNew(k,2))*strainInc(k,2)
+     &      + 2.d0*(stressOld(k,3) + stressNew(k,3))*strainInc(k,3))
+         enerInternNew(k) = enerInternOld(k) + u1/density(k)
+      END DO
+C
+      END IF
+C
+      RETURN
+C
+      END
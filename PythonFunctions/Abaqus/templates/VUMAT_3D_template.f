@@ -0,0 +1,201 @@
+C *******************************************************************
+C  VUMAT (3D solid, block-vectorized)
+C     
+C  ---------------------------------------------------
+C  Authors:  Jamie Simon
+C  Date:     2024-05-10
+C  E-mail:   ...
+C  Source:   
+C *******************************************************************
+C
+C  Strain-energy function:
+C
+C  *** INPUT FROM PYTHON PROGRAM *** STRAIN ENERGY DEFINITION
+C
+C  Description: The invariants, the derivatives of the strain-energy
+C               function and the stresses are computed in separate
+C               passes over the block of material points. Every pass
+C               is a simple loop over nblock arrays, which compilers
+C               can vectorize (SIMD).
+C
+C               stretchNew(k,1..6) = U11, U22, U33, U12, U23, U31
+C
+C *******************************************************************
+C
+      subroutine vumat(
+     & nblock, ndir, nshr, nstatev, nfieldv, nprops, lanneal,
+     & stepTime, totalTime, dt, cmname, coordMp, charLength,
+     & props, density, strainInc, relSpinInc,
+     & tempOld, stretchOld, defgradOld, fieldOld,
+     & stressOld, stateOld, enerInternOld, enerInelasOld,
+     & tempNew, stretchNew, defgradNew, fieldNew,
+     & stressNew, stateNew, enerInternNew, enerInelasNew )
+C
+      INCLUDE 'vaba_param.inc'
+C
+      dimension props(nprops), density(nblock), coordMp(nblock,*),
+     & charLength(nblock), strainInc(nblock,ndir+nshr),
+     & relSpinInc(nblock,nshr), tempOld(nblock),
+     & stretchOld(nblock,ndir+nshr),
+     & defgradOld(nblock,ndir+nshr+nshr),
+     & fieldOld(nblock,nfieldv), stressOld(nblock,ndir+nshr),
+     & stateOld(nblock,nstatev), enerInternOld(nblock),
+     & enerInelasOld(nblock), tempNew(nblock),
+     & stretchNew(nblock,ndir+nshr),
+     & defgradNew(nblock,ndir+nshr+nshr),
+     & fieldNew(nblock,nfieldv),
+     & stressNew(nblock,ndir+nshr), stateNew(nblock,nstatev),
+     & enerInternNew(nblock), enerInelasNew(nblock)
+C
+      CHARACTER*80 cmname
+C
+C     LOCAL VARIABLES
+C     ---------------
+C 	  *** INPUT FROM PYTHON PROGRAM *** MATERIAL INITIATION
+      REAL*8 G1, k1, trace, u1, Jm23
+      REAL*8 B11(nblock), B22(nblock), B33(nblock),
+     & B12(nblock), B23(nblock), B31(nblock)
+      REAL*8 I1b(nblock), I2b(nblock), detJ(nblock)
+      REAL*8 dWdI1(nblock), dWdI2(nblock), dWdJ(nblock)
+      REAL*8 p1(nblock), p2(nblock), p3(nblock)
+      INTEGER k
+C
+C     MATERIAL PARAMETERS
+C     ----------------------------------------------------------------
+C 	  *** INPUT FROM PYTHON PROGRAM *** MATERIAL PARAMETERS
+C
+C     COMPUTE SHEAR AND KAPPA MODULUS
+C     ----------------------------------------------------------------
+      G1 = E/(2.d0*(1.d0 + nu))
+      k1 = E/(3.d0*(1.d0 - 2.d0*nu))
+C
+C     ***************************************************************
+C     ------------ INITIALIZE MATERIAL AS LINEARLY ELASTIC ----------
+C      sigma_ij = 2*G1*epsilon_ij+(k1 - 2/3*G1) delta_ij*epsilon_kk
+C     ***************************************************************
+C
+      IF (totalTime.EQ.0.0) THEN
+         DO k = 1,nblock
+            trace = strainInc(k,1) + strainInc(k,2) + strainInc(k,3)
+            stressNew(k,1) = stressOld(k,1) + 2.d0*G1*strainInc(k,1)
+     &                     + (k1 - 2.d0/3.d0*G1)*trace
+            stressNew(k,2) = stressOld(k,2) + 2.d0*G1*strainInc(k,2)
+     &                     + (k1 - 2.d0/3.d0*G1)*trace
+            stressNew(k,3) = stressOld(k,3) + 2.d0*G1*strainInc(k,3)
+     &                     + (k1 - 2.d0/3.d0*G1)*trace
+            stressNew(k,4) = stressOld(k,4) + 2.d0*G1*strainInc(k,4)
+            stressNew(k,5) = stressOld(k,5) + 2.d0*G1*strainInc(k,5)
+            stressNew(k,6) = stressOld(k,6) + 2.d0*G1*strainInc(k,6)
+         END DO
+C
+      ELSE
+C
+C     ***************************************************************
+C     ------------ PASS 1: LEFT CAUCHY-GREEN TENSOR AND J -----------
+C      B^star_ij = U_ik*U_kj (corotational), J = det(U)
+C     ***************************************************************
+C
+      DO k = 1,nblock
+         B11(k) = stretchNew(k,1)*stretchNew(k,1)
+     &          + stretchNew(k,4)*stretchNew(k,4)
+     &          + stretchNew(k,6)*stretchNew(k,6)
+         B22(k) = stretchNew(k,4)*stretchNew(k,4)
+     &          + stretchNew(k,2)*stretchNew(k,2)
+     &          + stretchNew(k,5)*stretchNew(k,5)
+         B33(k) = stretchNew(k,6)*stretchNew(k,6)
+     &          + stretchNew(k,5)*stretchNew(k,5)
+     &          + stretchNew(k,3)*stretchNew(k,3)
+         B12(k) = stretchNew(k,1)*stretchNew(k,4)
+     &          + stretchNew(k,4)*stretchNew(k,2)
+     &          + stretchNew(k,6)*stretchNew(k,5)
+         B23(k) = stretchNew(k,4)*stretchNew(k,6)
+     &          + stretchNew(k,2)*stretchNew(k,5)
+     &          + stretchNew(k,5)*stretchNew(k,3)
+         B31(k) = stretchNew(k,6)*stretchNew(k,1)
+     &          + stretchNew(k,5)*stretchNew(k,4)
+     &          + stretchNew(k,3)*stretchNew(k,6)
+         detJ(k) = stretchNew(k,1)*(stretchNew(k,2)*stretchNew(k,3)
+     &                            - stretchNew(k,5)*stretchNew(k,5))
+     &           - stretchNew(k,4)*(stretchNew(k,4)*stretchNew(k,3)
+     &                            - stretchNew(k,5)*stretchNew(k,6))
+     &           + stretchNew(k,6)*(stretchNew(k,4)*stretchNew(k,5)
+     &                            - stretchNew(k,2)*stretchNew(k,6))
+      END DO
+C
+C     ***************************************************************
+C     ------------ PASS 2: MODIFIED TENSOR AND INVARIANTS -----------
+C      Bbar_ij = J^(-2/3)*B^star_ij, I1b = tr(Bbar),
+C      I2b = 1/2*(I1b^2 - tr(Bbar*Bbar))
+C     ***************************************************************
+C
+      DO k = 1,nblock
+         Jm23 = detJ(k)**(-2.d0/3.d0)
+         B11(k) = Jm23*B11(k)
+         B22(k) = Jm23*B22(k)
+         B33(k) = Jm23*B33(k)
+         B12(k) = Jm23*B12(k)
+         B23(k) = Jm23*B23(k)
+         B31(k) = Jm23*B31(k)
+         I1b(k) = B11(k) + B22(k) + B33(k)
+         I2b(k) = 0.5d0*(I1b(k)*I1b(k)
+     &          - (B11(k)*B11(k) + B22(k)*B22(k) + B33(k)*B33(k)
+     &          + 2.d0*(B12(k)*B12(k) + B23(k)*B23(k)
+     &                + B31(k)*B31(k))))
+      END DO
+C
+C     ***************************************************************
+C     ------------ PASS 3: DERIVATIVES OF STRAIN-ENERGY FUNCTION ----
+C     ***************************************************************
+C
+      DO k = 1,nblock
+C		 *** INPUT FROM PYTHON PROGRAM *** DERIVATIVE OF STRAIN-ENERGY FUNCTION
+      END DO
+C
+C     ***************************************************************
+C     ------------ PASS 4: COROTATIONAL STRESS ----------------------
+C      sigma_ij = 2/J *(dWdI1+dWdI2*I1b)*Bbar_ij -
+C                 2/J * dWdI2*Bbar_ik*Bbar_kj +
+C                 (dWdJ - 2*I1b/(3*J) * dWdI1 - (4*I2b)/(3*J) * dWdI2)*delta_ij
+C     ***************************************************************
+C
+      DO k = 1,nblock
+         p1(k) = (2.d0/detJ(k))*(dWdI1(k) + dWdI2(k)*I1b(k))
+         p2(k) = (2.d0/detJ(k))*dWdI2(k)
+         p3(k) = dWdJ(k) - (2.d0*I1b(k))/(3.d0*detJ(k))*dWdI1(k)
+     &         - (4.d0*I2b(k))/(3.d0*detJ(k))*dWdI2(k)
+      END DO
+C
+      DO k = 1,nblock
+         stressNew(k,1) = p1(k)*B11(k) + p3(k) - p2(k)*(B11(k)*B11(k)
+     &                  + B12(k)*B12(k) + B31(k)*B31(k))
+         stressNew(k,2) = p1(k)*B22(k) + p3(k) - p2(k)*(B12(k)*B12(k)
+     &                  + B22(k)*B22(k) + B23(k)*B23(k))
+         stressNew(k,3) = p1(k)*B33(k) + p3(k) - p2(k)*(B31(k)*B31(k)
+     &                  + B23(k)*B23(k) + B33(k)*B33(k))
+         stressNew(k,4) = p1(k)*B12(k) - p2(k)*(B11(k)*B12(k)
+     &                  + B12(k)*B22(k) + B31(k)*B23(k))
+         stressNew(k,5) = p1(k)*B23(k) - p2(k)*(B12(k)*B31(k)
+     &                  + B22(k)*B23(k) + B23(k)*B33(k))
+         stressNew(k,6) = p1(k)*B31(k) - p2(k)*(B31(k)*B11(k)
+     &                  + B23(k)*B12(k) + B33(k)*B31(k))
+      END DO
+C
+C     ***************************************************************
+C     ------------ PASS 5: SPECIFIC INTERNAL ENERGY -----------------
+C     ***************************************************************
+C
+      DO k = 1,nblock
+         u1 = 0.5d0*( (stressOld(k,1) + stressNew(k,1))*strainInc(k,1)
+     &              + (stressOld(k,2) + stressNew(k,2))*strainInc(k,2)
+     &              + (stressOld(k,3) + stressNew(k,3))*strainInc(k,3)
+     &      + 2.d0*( (stressOld(k,4) + stressNew(k,4))*strainInc(k,4)
+     &             + (stressOld(k,5) + stressNew(k,5))*strainInc(k,5)
+     &             + (stressOld(k,6) + stressNew(k,6))*strainInc(k,6)))
+         enerInternNew(k) = enerInternOld(k) + u1/density(k)
+      END DO
+C
+      END IF
+C
+      RETURN
+C
+      END
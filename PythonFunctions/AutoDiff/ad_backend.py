@@ -0,0 +1,210 @@
+##############################################################################
+##
+## Author:      Jamie E. Simon
+##
+## Description: Automatic-differentiation backend. The strain energy density
+##              is written as a NumPy function W(I1b, I2b, J, *params) and the
+##              stress, parameter gradients and tangents are obtained with
+##              forward-mode dual numbers instead of SymPy. The callables have
+##              the same signature as the lambdified symbolic functions.
+##
+##############################################################################
+
+## Import modulues
+import time
+import numpy as np
+from .dual_numbers import Dual, DualDerivative, DualValue
+from ..StretchDescription.stretches_invariants import InvariantsNumerical
+from ..StressDescription.invariant_engine import StressFromInvariantDerivatives
+from ..Optimization.optimization_routines import StretchParameterArgs
+
+
+def InvariantDerivativesAD(EnergyFunction):
+    """ This module differentiates the strain energy density with respect to
+        the modified invariants and the jacobian using dual numbers.
+
+    input
+    ---------
+    EnergyFunction: callable, W(I1b, I2b, J, *params) written with NumPy operations
+
+    output
+    ---------
+    dW_func: callable, dW_func(I1b, I2b, J, *params) -> [dWdI1b, dWdI2b, dWdJ]
+
+    """
+
+    def dW_func(I1b, I2b, Jac, *param_values):
+        derivatives = []
+        for i in range(3):
+            ## Seed one invariant and evaluate W
+            invariants = [I1b, I2b, Jac]
+            invariants[i] = Dual.variable(invariants[i])
+            W = EnergyFunction(*invariants, *param_values)
+            derivatives.append(DualDerivative(W, invariants[i]))
+        return derivatives
+
+    return dW_func
+
+
+def FirstPiolaKirschoffStressAD(EnergyFunction, incompressible = False):
+    """ This module computes the first Piola-Kirschoff stress under the
+        assumption of uniaxial tension from a NumPy strain energy density.
+        It is a drop-in alternative to lambdifying FirstPiolaKirschoffStress.
+
+    input
+    ---------
+    EnergyFunction: callable, W(I1b, I2b, J, *params) written with NumPy operations
+
+    incompressible: bool, use the Lagrange multiplier from P33 = 0
+
+    output
+    ---------
+    P22_func: callable, P22_func(L11, L22, L33, *params) -> P22 [MPa]
+
+    """
+
+    return StressFromInvariantDerivatives(InvariantDerivativesAD(EnergyFunction),
+                                          incompressible = incompressible)
+
+
+def EnergyAD(EnergyFunction):
+    """ This module creates the strain energy density as function of the
+        stretches. It is a drop-in alternative to lambdifying
+        EnergyInvariantModified.
+
+    input
+    ---------
+    EnergyFunction: callable, W(I1b, I2b, J, *params) written with NumPy operations
+
+    output
+    ---------
+    W_func: callable, W_func(L11, L22, L33, *params) -> W [J]
+
+    """
+
+    def W_func(L11, L22, L33, *param_values):
+        ## Get the invariants and evaluate the energy
+        I1b_n, I2b_n, Jac_n, _, _ = InvariantsNumerical(L11, L22, L33)
+        return EnergyFunction(I1b_n, I2b_n, Jac_n, *param_values) + np.zeros_like(I1b_n)
+
+    return W_func
+
+
+def ObjectiveGradientSSD(params,PredictionStatement_i,StressFunction_i,Xi,Yi, nu = 0.5):
+    """ Computes the gradient of ObjectiveFunctionSSD with respect to the
+        parameters by seeding each parameter with a dual number. It takes
+        the same arguments as ObjectiveFunctionSSD so that it can be passed
+        as jac to OptimizationSLSQP, and works with symbolic (lambdified)
+        and AD stress functions alike.
+
+    input
+    ---------
+    params: array_like, parameters (n_params,)
+
+    PredictionStatement_i: callable, unused, kept for the objective signature
+
+    StressFunction_i: callable, stress function of the stretches and params
+
+    Xi: array_like, strain values (N,)
+
+    Yi: array_like, stress values (N,)
+
+    nu: float, poisson's ratio [-]
+
+    output
+    ---------
+    gradient: ndarray, d(SSD)/d(params) (n_params,)
+
+    """
+
+    ## Collect all inputs: stretches and params
+    input_args = StretchParameterArgs(params, Xi, nu = nu)
+    gradient = np.zeros(len(params))
+
+    for i in range(len(params)):
+        ## Seed the i'th parameter and evaluate the stress
+        seeded = list(input_args)
+        seeded[3 + i] = Dual.variable(seeded[3 + i])
+        Y = StressFunction_i(*seeded)
+
+        ## Chain rule of the mean of squared differences
+        Yj = DualValue(Y, seeded[3 + i])
+        dYj = DualDerivative(Y, seeded[3 + i])
+        gradient[i] = (2/len(Yi))*np.sum((Yj - Yi)*dYj)
+
+    return gradient
+
+
+def TangentModulusAD(params, StressFunction, Xi, nu = 0.5):
+    """ Computes the tangent modulus d(P22)/d(strain) by seeding the strain
+        with a dual number. AD stress functions are differentiated twice
+        through nested duals.
+
+    input
+    ---------
+    params: array_like, parameters (n_params,)
+
+    StressFunction: callable, stress function of the stretches and params
+
+    Xi: array_like, strain values (N,)
+
+    nu: float, poisson's ratio [-]
+
+    output
+    ---------
+    tangent_modulus: ndarray, d(P22)/d(strain) [MPa] (N,)
+
+    """
+
+    ## Compute the stretches from a seeded strain
+    eps = Dual.variable(np.asarray(Xi, dtype=float))
+    lam2 = 1.0 + eps
+    lam1 = lam2**(-nu)
+    lam3 = lam2**(-nu)
+
+    ## Evaluate the stress and extract the derivative
+    Y = StressFunction(lam1, lam2, lam3, *params)
+
+    return np.broadcast_to(DualDerivative(Y, eps), np.shape(Xi))
+
+
+def CompareBackends(StressFunctions, params, Xi, nu = 0.5, repeats = 50):
+    """ Checks stress functions of different backends against each other and
+        times their evaluation.
+
+    input
+    ---------
+    StressFunctions: dict, backend name -> stress function, the first entry is the reference
+
+    params: array_like, parameters (n_params,)
+
+    Xi: array_like, strain values (N,)
+
+    nu: float, poisson's ratio [-]
+
+    repeats: int, number of timed evaluations
+
+    output
+    ---------
+    comparison: dict, backend name -> {'max_rel_error', 'eval_time'}
+
+    """
+
+    ## Collect all inputs: stretches and params
+    input_args = StretchParameterArgs(params, Xi, nu = nu)
+
+    comparison, reference = {}, None
+    for name, StressFunction in StressFunctions.items():
+        ## Time the evaluation
+        start = time.perf_counter()
+        for _ in range(repeats):
+            Y = StressFunction(*input_args)
+        elapsed = (time.perf_counter() - start) / repeats
+
+        ## Relative error against the first backend
+        if reference is None:
+            reference = Y
+        error = np.max(np.abs(Y - reference)) / max(np.max(np.abs(reference)), np.finfo(float).tiny)
+        comparison[name] = {'max_rel_error': float(error), 'eval_time': elapsed}
+
+    return comparison
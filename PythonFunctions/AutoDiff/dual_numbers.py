@@ -0,0 +1,203 @@
+##############################################################################
+##
+## Author:      Jamie E. Simon
+##
+## Description: Forward-mode automatic differentiation with dual numbers in
+##              pure NumPy. Duals can be nested (a dual whose value is a dual)
+##              to obtain second derivatives, each nesting level is identified
+##              by a tag to avoid perturbation confusion.
+##
+##############################################################################
+
+## Import modulues
+import itertools
+import numpy as np
+
+
+## Counter for the nesting level of new dual variables
+DUAL_TAGS = itertools.count(1)
+
+
+class Dual:
+    """ Dual number value + grad * eps with eps**2 = 0.
+
+    input
+    ---------
+    value: float, ndarray or Dual, function value
+
+    grad: float, ndarray or Dual, directional derivative
+
+    tag: int, nesting level, duals with a different tag are treated as constants
+
+    """
+
+    ## Make NumPy defer binary operators with arrays to the dual
+    __array_priority__ = 1000
+
+    def __init__(self, value, grad, tag):
+        self.value = value
+        self.grad = grad
+        self.tag = tag
+
+    @classmethod
+    def variable(cls, value):
+        ## Seed a new independent variable with a fresh tag
+        return cls(value, 1.0, next(DUAL_TAGS))
+
+    def split(self, other):
+        ## Value and derivative of other at the nesting level of self
+        if isinstance(other, Dual) and other.tag == self.tag:
+            return other.value, other.grad
+        return other, 0.0
+
+    def defer(self, other):
+        ## Duals created later (inner level) take precedence
+        return isinstance(other, Dual) and other.tag > self.tag
+
+    def __add__(self, other):
+        if self.defer(other):
+            return other.__radd__(self)
+        v, g = self.split(other)
+        return Dual(self.value + v, self.grad + g, self.tag)
+
+    def __radd__(self, other):
+        v, g = self.split(other)
+        return Dual(v + self.value, g + self.grad, self.tag)
+
+    def __sub__(self, other):
+        if self.defer(other):
+            return other.__rsub__(self)
+        v, g = self.split(other)
+        return Dual(self.value - v, self.grad - g, self.tag)
+
+    def __rsub__(self, other):
+        v, g = self.split(other)
+        return Dual(v - self.value, g - self.grad, self.tag)
+
+    def __mul__(self, other):
+        if self.defer(other):
+            return other.__rmul__(self)
+        v, g = self.split(other)
+        return Dual(self.value * v, self.grad * v + self.value * g, self.tag)
+
+    def __rmul__(self, other):
+        v, g = self.split(other)
+        return Dual(v * self.value, v * self.grad + g * self.value, self.tag)
+
+    def __truediv__(self, other):
+        if self.defer(other):
+            return other.__rtruediv__(self)
+        v, g = self.split(other)
+        return Dual(self.value / v, (self.grad * v - self.value * g) / (v * v), self.tag)
+
+    def __rtruediv__(self, other):
+        v, g = self.split(other)
+        return Dual(v / self.value, (g * self.value - v * self.grad) / (self.value * self.value), self.tag)
+
+    def __pow__(self, other):
+        if self.defer(other):
+            return other.__rpow__(self)
+        v, g = self.split(other)
+        power = self.value ** v
+        grad = v * self.value ** (v - 1) * self.grad
+        if not (isinstance(g, float) and g == 0.0):
+            ## Exponent depends on the variable as well
+            grad = grad + power * np.log(self.value) * g
+        return Dual(power, grad, self.tag)
+
+    def __rpow__(self, other):
+        v, _ = self.split(other)
+        power = v ** self.value
+        return Dual(power, power * np.log(v) * self.grad, self.tag)
+
+    def __neg__(self):
+        return Dual(-self.value, -self.grad, self.tag)
+
+    def __pos__(self):
+        return self
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        ## Only plain elementwise calls are supported
+        if method != '__call__' or kwargs:
+            return NotImplemented
+
+        ## Binary arithmetic, dispatched to the innermost dual
+        if ufunc in BINARY_UFUNCS:
+            a, b = inputs
+            left, right = BINARY_UFUNCS[ufunc]
+            a_tag = a.tag if isinstance(a, Dual) else 0
+            b_tag = b.tag if isinstance(b, Dual) else 0
+            if a_tag >= b_tag:
+                return getattr(a, left)(b)
+            return getattr(b, right)(a)
+
+        ## Unary functions: chain rule with the derivative of the function
+        if ufunc in UNARY_UFUNCS:
+            (x,) = inputs
+            f, dfdx = UNARY_UFUNCS[ufunc]
+            return Dual(f(x.value), dfdx(x.value) * x.grad, x.tag)
+
+        return NotImplemented
+
+
+def RealPart(x):
+    ## Innermost (real) value of a possibly nested dual
+    while isinstance(x, Dual):
+        x = x.value
+    return x
+
+
+## Binary ufuncs mapped to the (left, reflected) dual operators
+BINARY_UFUNCS = {
+    np.add:         ('__add__', '__radd__'),
+    np.subtract:    ('__sub__', '__rsub__'),
+    np.multiply:    ('__mul__', '__rmul__'),
+    np.true_divide: ('__truediv__', '__rtruediv__'),
+    np.power:       ('__pow__', '__rpow__'),
+}
+
+## Unary ufuncs mapped to (function, derivative)
+UNARY_UFUNCS = {
+    np.negative: (np.negative, lambda x: -1.0),
+    np.square:   (np.square,   lambda x: 2.0 * x),
+    np.exp:      (np.exp,      np.exp),
+    np.log:      (np.log,      lambda x: 1.0 / x),
+    np.sqrt:     (np.sqrt,     lambda x: 0.5 / np.sqrt(x)),
+    np.cbrt:     (np.cbrt,     lambda x: 1.0 / (3.0 * np.cbrt(x)**2)),
+    np.sin:      (np.sin,      np.cos),
+    np.cos:      (np.cos,      lambda x: -np.sin(x)),
+    np.tan:      (np.tan,      lambda x: 1.0 / np.cos(x)**2),
+    np.sinh:     (np.sinh,     np.cosh),
+    np.cosh:     (np.cosh,     np.sinh),
+    np.tanh:     (np.tanh,     lambda x: 1.0 - np.tanh(x)**2),
+    np.arctan:   (np.arctan,   lambda x: 1.0 / (1.0 + x * x)),
+    np.arctanh:  (np.arctanh,  lambda x: 1.0 / (1.0 - x * x)),
+    np.absolute: (np.absolute, lambda x: np.sign(RealPart(x))),
+}
+
+
+def DualDerivative(y, x):
+    """ Extracts the derivative with respect to the dual variable x.
+
+    input
+    ---------
+    y: Dual, float or ndarray, function output
+
+    x: Dual, seeded variable
+
+    output
+    ---------
+    dydx: derivative of y with respect to x (0.0 if y does not depend on x)
+
+    """
+
+    if isinstance(y, Dual) and y.tag == x.tag:
+        return y.grad
+    return 0.0
+
+
+def DualValue(y, x):
+    ## Value of y at the nesting level of x
+    if isinstance(y, Dual) and y.tag == x.tag:
+        return y.value
+    return y
@@ -0,0 +1,122 @@
+##############################################################################
+##
+## Author:      Jamie E. Simon
+##
+## Description: Chunked, multi-threaded evaluation of the stress and energy
+##              kernels for large datasets. The strain array is split into
+##              cache-sized chunks evaluated on a thread pool (NumPy ufuncs
+##              release the GIL). Every chunk writes its slice of a single
+##              output array per call and the objective is reduced in place
+##              per chunk in a residual buffer reused between iterations.
+##
+##############################################################################
+
+## Import modulues
+import os
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from .optimization_routines import PredictionStatementTension
+from .optimization_routines import ObjectiveFunctionSSD
+from .optimization_routines import EnergyConstraintTension
+
+
+class ChunkedEvaluator:
+    """ Thread pool evaluating functions of the strain over chunks.
+
+    input
+    ---------
+    n_threads: int, number of threads (number of cores if None)
+
+    chunk_size: int, number of strain points per chunk
+    """
+
+    def __init__(self, n_threads = None, chunk_size = 2**14):
+        self.n_threads = n_threads or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.pool = ThreadPoolExecutor(max_workers=self.n_threads)
+        self.local = threading.local()
+
+    def chunks(self, n_points):
+        ## Slices of the strain axis
+        return [slice(i, min(i + self.chunk_size, n_points))
+                for i in range(0, n_points, self.chunk_size)]
+
+    def buffer(self, name, n_points):
+        ## Reuse buffers between calls of the optimizer. Buffers are owned by
+        ## the calling thread, so concurrent callers (e.g. fits in threads)
+        ## sharing an evaluator never write into the same buffer
+        buffers = self.local.__dict__.setdefault('buffers', {})
+        buf = buffers.get(name)
+        if buf is None or buf.shape[0] != n_points:
+            buf = buffers[name] = np.empty(n_points)
+        return buf
+
+    def run(self, task, n_points):
+        ## Evaluate the task for all chunks, inline for a single chunk
+        chunks = self.chunks(n_points)
+        if len(chunks) == 1 or self.n_threads == 1:
+            return [task(sl) for sl in chunks]
+        return list(self.pool.map(task, chunks))
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+## Evaluator shared by the drop-in functions below
+DEFAULT_EVALUATOR = None
+
+
+def DefaultEvaluator():
+    ## Create the shared evaluator on first use
+    global DEFAULT_EVALUATOR
+    if DEFAULT_EVALUATOR is None:
+        DEFAULT_EVALUATOR = ChunkedEvaluator()
+    return DEFAULT_EVALUATOR
+
+
+def PredictionStatementTensionChunked(params,StressFunction,Xi, nu = 0.5, evaluator = None):
+    ## Stacked parameter grids are handled by the broadcast evaluation
+    if np.ndim(params) == 2:
+        return PredictionStatementTension(params, StressFunction, Xi, nu = nu)
+    evaluator = evaluator or DefaultEvaluator()
+    Xi = np.asarray(Xi, dtype=float)
+    ## Output of this call, every chunk writes its own slice
+    Ypred = np.empty(len(Xi))
+    def task(sl):
+        Ypred[sl] = PredictionStatementTension(params, StressFunction, Xi[sl], nu = nu)
+    evaluator.run(task, len(Xi))
+    return Ypred
+
+
+def ObjectiveFunctionSSDChunked(params,PredictionStatement_i,StressFunction_i,Xi,Yi, nu = 0.5,
+                                evaluator = None):
+    ## Stacked parameter grids are handled by the broadcast evaluation
+    if np.ndim(params) == 2:
+        return ObjectiveFunctionSSD(params, PredictionStatement_i, StressFunction_i, Xi, Yi, nu = nu)
+    evaluator = evaluator or DefaultEvaluator()
+    ## Residual buffer of the calling thread, reused between iterations
+    residual = evaluator.buffer('residual', len(Yi))
+    def task(sl):
+        ## Prediction of the chunk and in-place squared difference
+        Yj = PredictionStatement_i(params, StressFunction_i, Xi[sl], nu = nu)
+        r = residual[sl]
+        np.subtract(Yj, Yi[sl], out=r)
+        np.multiply(r, r, out=r)
+        return r.sum()
+    ## Sum of the partial sums of squared differences
+    SSD = (1/len(Yi))*sum(evaluator.run(task, len(Yi)))
+    return SSD
+
+
+def EnergyConstraintTensionChunked(params,EnergyFunction,Xi,nu = 0.5, evaluator = None):
+    ## Stacked parameter grids are handled by the broadcast evaluation
+    if np.ndim(params) == 2:
+        return EnergyConstraintTension(params, EnergyFunction, Xi, nu = nu)
+    evaluator = evaluator or DefaultEvaluator()
+    ## Constraint vector of this call, every chunk writes its own slice
+    Wvals = np.empty(len(Xi))
+    def task(sl):
+        Wvals[sl] = EnergyConstraintTension(params, EnergyFunction, Xi[sl], nu = nu)
+    evaluator.run(task, len(Xi))
+    return Wvals
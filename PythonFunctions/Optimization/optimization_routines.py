@@ -10,31 +10,59 @@
 import numpy as np
 from scipy.optimize import minimize
 
-def PredictionStatementTension(params,StressFunction,Xi, nu = 0.5):
+def StretchParameterArgs(params,Xi,nu = 0.5):
     ## Compute the stretches in the x- and z-directions, considering incompressibility
-    lam2 = 1.0 + Xi
+    lam2 = 1.0 + np.asarray(Xi, dtype=float)
     lam1 = lam2**(-nu)
     lam3 = lam2**(-nu)
+    ## A stacked (M, n_params) parameter array is broadcast against the strain
+    ## axis: stretches become (1, N) rows and each parameter an (M, 1) column
+    params = np.asarray(params, dtype=float)
+    if params.ndim == 2:
+        lam1, lam2, lam3 = lam1[np.newaxis,:], lam2[np.newaxis,:], lam3[np.newaxis,:]
+        params = [params[:,i:i+1] for i in range(params.shape[1])]
+    ## Collect all inputs: stretches and params
+    return [lam1,lam2,lam3] + list(params)
+
+def PredictionStatementTension(params,StressFunction,Xi, nu = 0.5):
     ## Collect all inputs: stretches and params
-    input_args = [lam1,lam2,lam3] + list(params)
+    input_args = StretchParameterArgs(params,Xi,nu = nu)
     ## Compute prediction statement based on input
     Ypred = StressFunction(*input_args)
+    ## Expand terms independent of the parameters or strain to the full grid
+    if np.ndim(params) == 2:
+        Ypred = np.broadcast_to(Ypred, (np.shape(params)[0], np.size(Xi)))
     return Ypred
+
+def ChunkRows(n_rows, n_cols, chunk_size = None, max_chunk_elements = 2**20):
+    ## Number of parameter rows evaluated at once, bounding the temporaries
+    ## of one chunk to roughly max_chunk_elements entries
+    if chunk_size is None:
+        chunk_size = max(1, max_chunk_elements // max(1, n_cols))
+    for i in range(0, n_rows, chunk_size):
+        yield slice(i, min(i + chunk_size, n_rows))
     
-def ObjectiveFunctionSSD(params,PredictionStatement_i,StressFunction_i,Xi,Yi, nu = 0.5):
-    ## Compute prediction statement
-    Yj = PredictionStatement_i(params,StressFunction_i,Xi, nu = nu)
-    ## Compute sum of squared differences
-    SSD = (1/len(Yi))*np.sum((Yj-Yi)**2)
+def ObjectiveFunctionSSD(params,PredictionStatement_i,StressFunction_i,Xi,Yi, nu = 0.5,
+                         chunk_size = None):
+    ## Single parameter vector, as called by the optimizer
+    if np.ndim(params) == 1:
+        ## Compute prediction statement
+        Yj = PredictionStatement_i(params,StressFunction_i,Xi, nu = nu)
+        ## Compute sum of squared differences
+        SSD = (1/len(Yi))*np.sum((Yj-Yi)**2)
+        return SSD
+    ## Stacked (M, n_params) parameters return M objectives, evaluated in
+    ## chunks of rows to bound the memory of the (M, N) predictions
+    params = np.asarray(params, dtype=float)
+    SSD = np.empty(params.shape[0])
+    for rows in ChunkRows(params.shape[0], len(Yi), chunk_size):
+        Yj = PredictionStatement_i(params[rows],StressFunction_i,Xi, nu = nu)
+        SSD[rows] = (1/len(Yi))*np.sum((Yj-Yi)**2, axis=-1)
     return SSD
 
 def EnergyConstraintTension(params,EnergyFunction,Xi,nu = 0.5):
-    ## Compute the stretches in the x- and z-directions, considering incompressibility
-    lam2 = 1.0 + Xi
-    lam1 = lam2**(-nu)
-    lam3 = lam2**(-nu)
     ## Collect all inputs: stretches and params
-    input_args = [lam1,lam2,lam3] + list(params)
+    input_args = StretchParameterArgs(params,Xi,nu = nu)
     ## Compute the energy function
     Wvals = EnergyFunction(*input_args)   
     return Wvals
@@ -42,7 +70,8 @@ def EnergyConstraintTension(params,EnergyFunction,Xi,nu = 0.5):
 
 def OptimizationSLSQP(ObjectiveFunction, coefs, args, constraints = False,
                       method = 'SLSQP', 
-                      options = {'ftol': 10e-30, 'disp': True, 'maxiter': 3000}):
+                      options = {'ftol': 10e-30, 'disp': True, 'maxiter': 3000},
+                      jac = None):
 
     # History of the parameter subject to optimization and 
     # History of the objective function
@@ -58,6 +87,7 @@ def OptimizationSLSQP(ObjectiveFunction, coefs, args, constraints = False,
     solution = minimize(ObjectiveFunction, coefs, args=args, 
                         constraints=constraints, 
                         method='SLSQP',
+                        jac=jac,
                         callback=callback,
                         options=options)
     
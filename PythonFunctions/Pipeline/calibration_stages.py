@@ -0,0 +1,155 @@
+##############################################################################
+##
+## Author:      Jamie E. Simon
+##
+## Description: Stages of the calibration pipeline run by PipelineRunner.
+##              Every stage returns picklable output so that it can be stored
+##              in the artifact store.
+##
+##############################################################################
+
+## Import modulues
+from functools import lru_cache
+import numpy as np
+from sympy import lambdify
+from ..StressDescription.piola_kirschoff_stress import FirstPiolaKirschoffStress
+from ..EnergyDescription.energy_substitution import EnergyInvariantModified
+from ..Abaqus.generate_vumat import GenerateVumatHyperelasticity
+from ..Abaqus.generate_vumat import GenerateVumatHyperelasticityVectorized
+from ..Optimization.optimization_routines import PredictionStatementTension
+from ..Optimization.optimization_routines import ObjectiveFunctionSSD
+from ..Optimization.optimization_routines import EnergyConstraintTension
+from ..Optimization.optimization_routines import OptimizationSLSQP
+from ..PlottingFunctions.plotting_functions import plotStressStrainCurve
+from ..PlottingFunctions.plotting_functions import plotTangenmodulus
+from ..PlottingFunctions.plotting_functions import saveMaterialParameters
+from ..PlottingFunctions.plotting_functions import plotOptimizationHistory
+from ..PlottingFunctions.plotting_functions import plotObjectiveLandscape
+from ..TangentModulus.numerical_elastic_modulus import NumericalElasticModulus
+from ..Sensitivity.objective_landscape import ObjectiveSlice2D
+from ..Sensitivity.objective_landscape import SensitivityMatrix
+from ..Sensitivity.objective_landscape import ParameterCorrelation
+
+
+@lru_cache(maxsize=8)
+def LambdifiedFunctions(derive, symbolic_combi_list):
+    ## Lambdified functions are not picklable, create them once per process
+    P22_total, W_modified = derive
+    P22_func = lambdify(symbolic_combi_list, P22_total, modules='numpy')
+    W_func = lambdify(symbolic_combi_list, W_modified, modules='numpy')
+    return P22_func, W_func
+
+
+def StageLoadData(data_file):
+    ## Load in data and set strain- and stress data
+    data = np.loadtxt(data_file.path, delimiter=',')
+    return data[:,0], data[:,1]
+
+
+def StageDerive(W, I1b, I2b, J_sym, stretches):
+    ## Get the stress function and the modified energy-formulation
+    P22_total = FirstPiolaKirschoffStress(W, I1b, I2b, J_sym, *stretches)
+    W_modified = EnergyInvariantModified(W, I1b, I2b, J_sym, *stretches)
+    return P22_total, W_modified
+
+
+def StageFit(load, derive, symbolic_combi_list, nu, options):
+    ## Get data and callable functions
+    eps_n, sig_n = load
+    P22_func, W_func = LambdifiedFunctions(derive, tuple(symbolic_combi_list))
+
+    # Initial guess
+    coefs = np.ones(len(symbolic_combi_list[3:]))
+
+    # Construct constraints and args
+    constraints = ({'type': 'ineq', 'fun': lambda params: EnergyConstraintTension(params, W_func, eps_n, nu = nu)})
+    args = (PredictionStatementTension, P22_func, eps_n, sig_n, nu)
+
+    # Conduct optimization and get best parameters
+    return OptimizationSLSQP(ObjectiveFunctionSSD, coefs, args,
+                             constraints = constraints, options = options)
+
+
+def StageModulus(load, derive, fit, symbolic_combi_list, nu):
+    ## Compute elastic modulus, based on prediction statement
+    eps_n, _ = load
+    P22_func, _ = LambdifiedFunctions(derive, tuple(symbolic_combi_list))
+    return NumericalElasticModulus(eps_n, PredictionStatementTension,
+                                   P22_func, fit[0], nu)
+
+
+def StageLandscape(load, derive, fit, symbolic_combi_list, nu, num = 81):
+    ## Get data, callable functions and optimal parameters
+    eps_n, sig_n = load
+    P22_func, _ = LambdifiedFunctions(derive, tuple(symbolic_combi_list))
+    model_coef_opt = fit[0]
+    args = (PredictionStatementTension, P22_func, eps_n, sig_n, nu)
+
+    # Sensitivity of the prediction to each parameter around the optimum
+    sensitivity = SensitivityMatrix(PredictionStatementTension, P22_func, model_coef_opt, eps_n, nu)
+    correlation = ParameterCorrelation(sensitivity)
+
+    # Objective landscape of the first two parameters around the optimum
+    C10_range = model_coef_opt[0] + np.linspace(-1.0, 1.0, num=num) * max(abs(model_coef_opt[0]), 1e-3)
+    C01_range = model_coef_opt[1] + np.linspace(-1.0, 1.0, num=num) * max(abs(model_coef_opt[1]), 1e-3)
+    landscape = ObjectiveSlice2D(ObjectiveFunctionSSD, model_coef_opt, (0, 1), C10_range, C01_range, args)
+
+    return correlation, C10_range, C01_range, landscape
+
+
+def StageVumat(W, symbolic_mater_list, symbolic_deriv_list, symbolic_namin_list, template_file):
+    # % Generate VUMAT fortran file
+    GenerateVumatHyperelasticity(W,
+                                 symbolic_mater_list,
+                                 symbolic_deriv_list,
+                                 symbolic_namin_list,
+                                 template_name = template_file.path.name)
+    return template_file.path.name
+
+
+def StageVumatVectorized(W, symbolic_mater_list, symbolic_deriv_list, symbolic_namin_list,
+                         invariant_symbols, template_file):
+    # % Generate block-vectorized (3D, plane stress) VUMAT fortran file
+    GenerateVumatHyperelasticityVectorized(W,
+                                           symbolic_mater_list,
+                                           symbolic_deriv_list,
+                                           symbolic_namin_list,
+                                           invariant_symbols,
+                                           template_name = template_file.path.name)
+    return template_file.path.name
+
+
+def StageOutput(load, derive, fit, modulus, landscape,
+                symbolic_combi_list, symbolic_param_list, symbolic_mater_list, nu,
+                plot_options = None):
+    ## Get data, callable functions and results of the upstream stages
+    eps_n, sig_n = load
+    P22_func, _ = LambdifiedFunctions(derive, tuple(symbolic_combi_list))
+    model_coef_opt, obj_hist, param_hist = fit
+    _, C10_range, C01_range, landscape_grid = landscape
+
+    # Plot options per figure, e.g. {'objective_landscape': {'levels_plot': 30}}
+    plot_options = plot_options or {}
+
+    # Build material output list
+    material_output_list = list(model_coef_opt) + [modulus, nu]
+
+    # Make artifical X-range
+    eps_p = np.linspace(np.min(eps_n)-np.min(eps_n)/10,np.max(eps_n)+np.min(eps_n)/10,num=50,endpoint = True)
+
+    # Compute prediction statement
+    sig_p = PredictionStatementTension(model_coef_opt, P22_func, eps_p, nu)
+
+    # Plot and save to output
+    plotStressStrainCurve(eps_n,sig_n,eps_p,sig_p,
+                          **plot_options.get('stress_strain', {}))
+    plotTangenmodulus(eps_p,sig_p, modulus,
+                      **plot_options.get('tangent_modulus', {}))
+    plotOptimizationHistory(obj_hist,param_hist,symbolic_param_list,
+                            **plot_options.get('optimization_history', {}))
+    plotObjectiveLandscape(C10_range, C01_range, landscape_grid,
+                           [str(param) for param in symbolic_param_list[:2]],
+                           **plot_options.get('objective_landscape', {}))
+    saveMaterialParameters(symbolic_mater_list,material_output_list)
+
+    return material_output_list
@@ -0,0 +1,298 @@
+##############################################################################
+##
+## Author:      Jamie E. Simon
+##
+## Description: Stage-level incremental pipeline. Each stage declares its
+##              inputs and upstream stages, its outputs are stored in a local
+##              artifact store and the stage is skipped when the hash of its
+##              inputs is unchanged.
+##
+##############################################################################
+
+## Import modulues
+import sys
+import time
+import inspect
+import pickle
+import hashlib
+from pathlib import Path
+import numpy as np
+import sympy as sp
+
+
+class FileInput:
+    """ Marks a stage input as a file whose content, not its path, is hashed.
+
+    input
+    ---------
+    path: str, path to the file
+
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def __repr__(self):
+        return f"FileInput('{self.path}')"
+
+
+def PackageModule(value, package):
+    ## Module of the same package a global refers to, None otherwise
+    if inspect.ismodule(value):
+        module = value
+    else:
+        module = sys.modules.get(getattr(value, '__module__', None) or '')
+    if module is None or module.__name__.split('.')[0] != package:
+        return None
+    return module
+
+
+def CodeNames(code):
+    ## Global names used by a code object and the code objects it contains
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= CodeNames(const)
+    return names
+
+
+def SourceDependencies(function):
+    """ Collects the source code a function depends on: its own source, the
+        functions of its module it calls and the full source of every module
+        of the same package it uses, recursively. A change in any of them
+        (e.g. a plot default or the objective) changes the hash of the stages
+        calling the function, while unrelated edits in the same module
+        (e.g. another stage) do not.
+
+    input
+    ---------
+    function: callable, stage function or callable stage input
+
+    output
+    ---------
+    sources: list, (name, source bytes) sorted by name
+
+    """
+
+    function = inspect.unwrap(function)
+    home = sys.modules.get(getattr(function, '__module__', None) or '')
+    if home is None:
+        return []
+    package = home.__name__.split('.')[0]
+    sources, functions, modules = {}, [], []
+
+    ## Plain functions are followed through the globals they use,
+    ## everything else through its module
+    if inspect.isfunction(function):
+        functions.append(function)
+    else:
+        modules.append(home)
+
+    while functions:
+        func = inspect.unwrap(functions.pop())
+        label = f"{func.__module__}.{func.__qualname__}"
+        if label in sources:
+            continue
+        try:
+            sources[label] = inspect.getsource(func).encode()
+        except (OSError, TypeError):
+            sources[label] = func.__code__.co_code
+        for name in CodeNames(func.__code__):
+            value = func.__globals__.get(name)
+            module = PackageModule(value, package) if value is not None else None
+            if module is None:
+                continue
+            unwrapped = inspect.unwrap(value) if callable(value) else value
+            if inspect.isfunction(unwrapped) and module.__name__ == func.__module__:
+                functions.append(unwrapped)
+            else:
+                modules.append(module)
+
+    ## Hash whole modules, following the package modules they import
+    while modules:
+        module = modules.pop()
+        if module.__name__ in sources:
+            continue
+        path = getattr(module, '__file__', None)
+        sources[module.__name__] = Path(path).read_bytes() if path else b''
+        for value in list(vars(module).values()):
+            dependency = PackageModule(value, package)
+            if dependency is not None and dependency.__name__ not in sources:
+                modules.append(dependency)
+
+    return sorted(sources.items())
+
+
+def HashValue(value, digest = None):
+    """ Updates a sha256 digest with the content of a stage input.
+
+    input
+    ---------
+    value: FileInput, numpy array, sympy object, container or picklable object
+
+    digest: hashlib object, digest to update (a new one if None)
+
+    output
+    ---------
+    digest: hashlib object, updated digest
+
+    """
+
+    ## Start a new digest
+    if digest is None:
+        digest = hashlib.sha256()
+
+    ## Tag every value with its type so that e.g. 1 and 1.0 differ
+    digest.update(type(value).__name__.encode())
+
+    if isinstance(value, FileInput):
+        ## Hash the file content
+        digest.update(value.path.read_bytes())
+    elif isinstance(value, np.ndarray):
+        ## Hash the array layout and raw data
+        digest.update(str((value.dtype, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, sp.Basic):
+        ## Hash the full structural representation of the expression
+        digest.update(sp.srepr(value).encode())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            HashValue(key, digest)
+            HashValue(value[key], digest)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            HashValue(item, digest)
+    elif callable(value):
+        ## Functions are identified by their qualified name and the source
+        ## code they depend on
+        digest.update(f"{getattr(value, '__module__', None)}.{getattr(value, '__qualname__', repr(value))}".encode())
+        for name, source in SourceDependencies(value):
+            digest.update(name.encode())
+            digest.update(source)
+    else:
+        try:
+            digest.update(pickle.dumps(value, protocol=4))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            digest.update(repr(value).encode())
+
+    return digest
+
+
+class Stage:
+    """ A single pipeline stage.
+
+    input
+    ---------
+    name: str, unique stage name
+
+    function: callable, called as function(**inputs, **upstream_outputs)
+
+    inputs: dict, keyword inputs whose content determines the stage hash
+
+    depends: list, names of upstream stages passed as keyword arguments
+
+    output_files: list, files written by the stage, the stage is rerun
+                  when any of them is missing
+
+    """
+
+    def __init__(self, name, function, inputs = None, depends = (), output_files = ()):
+        self.name = name
+        self.function = function
+        self.inputs = dict(inputs or {})
+        self.depends = list(depends)
+        self.output_files = [Path(p) for p in output_files]
+
+
+class PipelineRunner:
+    """ Runs stages in the order they are added and reuses stored artifacts
+        for stages whose input hash is unchanged.
+
+    input
+    ---------
+    store_path: str, directory of the local artifact store
+
+    """
+
+    def __init__(self, store_path = 'output//artifacts'):
+        self.store_path = Path(store_path)
+        self.stages = []
+        self.report = []
+
+    def add_stage(self, name, function, inputs = None, depends = (), output_files = ()):
+        ## Upstream stages have to be defined first
+        known = [stage.name for stage in self.stages]
+        missing = [dep for dep in depends if dep not in known]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on undefined stage(s): {missing}")
+        self.stages.append(Stage(name, function, inputs, depends, output_files))
+
+    def stage_key(self, stage, output_hashes):
+        ## Combine the stage name, function, inputs and upstream content hashes
+        digest = HashValue((stage.name, stage.function, stage.inputs))
+        for dep in stage.depends:
+            digest.update(output_hashes[dep].encode())
+        return digest.hexdigest()
+
+    def artifact_path(self, stage, key):
+        return self.store_path / stage.name / (key + '.pkl')
+
+    def run(self, force = ()):
+        """ Runs the pipeline.
+
+        input
+        ---------
+        force: list, names of stages to rerun regardless of their hash
+
+        output
+        ---------
+        outputs: dict, stage name -> stage output
+
+        """
+
+        ## Stage outputs and content hashes of the outputs
+        outputs, output_hashes = {}, {}
+        self.report = []
+
+        for stage in self.stages:
+            start = time.perf_counter()
+
+            ## Hash inputs and look up the artifact
+            key = self.stage_key(stage, output_hashes)
+            path = self.artifact_path(stage, key)
+            cached = (path.exists() and stage.name not in force
+                      and all(p.exists() for p in stage.output_files))
+
+            if cached:
+                ## Reuse the stored artifact
+                with path.open('rb') as f:
+                    artifact = pickle.load(f)
+            else:
+                ## Run the stage with its inputs and upstream outputs
+                kwargs = dict(stage.inputs)
+                kwargs.update({dep: outputs[dep] for dep in stage.depends})
+                result = stage.function(**kwargs)
+
+                ## Store the output together with its content hash
+                payload = pickle.dumps(result, protocol=4)
+                artifact = {'output': result,
+                            'output_hash': hashlib.sha256(payload).hexdigest()}
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with path.open('wb') as f:
+                    pickle.dump(artifact, f, protocol=4)
+
+            outputs[stage.name] = artifact['output']
+            output_hashes[stage.name] = artifact['output_hash']
+            self.report.append((stage.name, 'skipped' if cached else 'ran',
+                                time.perf_counter() - start))
+
+        self.print_report()
+
+        return outputs
+
+    def print_report(self):
+        ## Print which stages ran and how long each took
+        print('Pipeline stages:')
+        for name, status, seconds in self.report:
+            print(f"  {name:<12} {status:<8} {seconds:8.3f} s")
+        return
@@ -236,3 +236,37 @@ def saveMaterialParameters(param_names,param_values):
         
     plt.close()
     return
+
+
+def plotObjectiveLandscape(Xi, Yi, Zi, param_names,
+                           picture_name = 'output//objectivelandscape.pdf',
+                           fontsize_plot   = 16,
+                           labelsize_plot  = 15,
+                           levels_plot     = 30):
+    
+    ## Initiate font settings
+    initiate_font_settings()
+
+    ## Set figure
+    fig,axes = plt.subplots(1,1,figsize = (7,6), tight_layout = True)
+
+    ## Plot the logarithm of the objective to resolve the valley floor
+    contour = axes.contourf(Xi,Yi,np.log10(Zi.T),levels=levels_plot,cmap='viridis')
+    colorbar = fig.colorbar(contour,ax=axes)
+    colorbar.set_label(r"$\log_{10}$ Objective Residual",fontsize=fontsize_plot)
+
+    ## Set x and y labels
+    axes.set_xlabel(param_names[0],fontsize=fontsize_plot)
+    axes.set_ylabel(param_names[1],fontsize=fontsize_plot) 
+
+    ## Set tick sizes
+    axes.tick_params(axis='both', which='major', labelsize=labelsize_plot)
+
+    ## Save figure !!!
+    plt.savefig(picture_name, bbox_inches='tight')
+    
+    ## Print saving output
+    print('Figure ' + picture_name + ' saved')
+    
+    plt.close()
+    return
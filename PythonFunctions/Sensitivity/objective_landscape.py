@@ -0,0 +1,147 @@
+##############################################################################
+##
+## Author:      Jamie E. Simon
+##
+## Description: Objective-landscape slices and finite-difference sensitivity
+##              of the calibrated model around the optimal parameters
+##
+##############################################################################
+
+## Import modulues
+import numpy as np
+
+
+def ObjectiveSlice1D(ObjectiveFunction, params_opt, index, values, args):
+    """ Evaluates the objective along one parameter axis, with all other
+        parameters held at their optimal values.
+
+    input
+    ---------
+    ObjectiveFunction: callable, objective accepting stacked (M, n_params) parameters
+
+    params_opt: array_like, optimal parameters (n_params,)
+
+    index: int, position of the parameter to vary
+
+    values: array_like, parameter values along the slice (M,)
+
+    args: tuple, extra arguments passed to the objective, as for OptimizationSLSQP
+
+    output
+    ---------
+    objective: ndarray, objective values along the slice (M,)
+
+    """
+
+    ## Stack the optimal parameters and replace the varied column
+    param_grid = np.tile(np.asarray(params_opt, dtype=float), (len(values), 1))
+    param_grid[:, index] = values
+
+    ## Evaluate all rows in one vectorized pass
+    return ObjectiveFunction(param_grid, *args)
+
+
+def ObjectiveSlice2D(ObjectiveFunction, params_opt, index_pair, values_i, values_j, args):
+    """ Evaluates the objective over a 2D grid of two parameters, with all
+        other parameters held at their optimal values.
+
+    input
+    ---------
+    ObjectiveFunction: callable, objective accepting stacked (M, n_params) parameters
+
+    params_opt: array_like, optimal parameters (n_params,)
+
+    index_pair: tuple, positions (i, j) of the two parameters to vary
+
+    values_i: array_like, values of parameter i (Mi,)
+
+    values_j: array_like, values of parameter j (Mj,)
+
+    args: tuple, extra arguments passed to the objective, as for OptimizationSLSQP
+
+    output
+    ---------
+    objective: ndarray, objective values on the grid (Mi, Mj)
+
+    """
+
+    ## Build the flattened grid of parameter pairs
+    i, j = index_pair
+    Vi, Vj = np.meshgrid(values_i, values_j, indexing='ij')
+    param_grid = np.tile(np.asarray(params_opt, dtype=float), (Vi.size, 1))
+    param_grid[:, i] = Vi.ravel()
+    param_grid[:, j] = Vj.ravel()
+
+    ## Evaluate all rows in one vectorized pass and restore the grid shape
+    return ObjectiveFunction(param_grid, *args).reshape(Vi.shape)
+
+
+def SensitivityMatrix(PredictionStatement, StressFunction, params_opt, Xi,
+                      nu = 0.5, rel_step = 1e-6):
+    """ Computes the sensitivity of the predicted stress to each parameter
+        using central finite differences around the optimal parameters.
+        All 2*n_params perturbed parameter vectors are evaluated at once.
+
+    input
+    ---------
+    PredictionStatement: callable, e.g. PredictionStatementTension
+
+    StressFunction: callable, lambdified stress function
+
+    params_opt: array_like, optimal parameters (n_params,)
+
+    Xi: array_like, strain values (N,)
+
+    nu: float, poisson's ratio used in the prediction [-]
+
+    rel_step: float, relative finite-difference step size [-]
+
+    output
+    ---------
+    jacobian: ndarray, d(stress)/d(params) [MPa/param] (N, n_params)
+
+    """
+
+    ## Set step sizes relative to the magnitude of each parameter
+    params_opt = np.asarray(params_opt, dtype=float)
+    steps = rel_step * np.maximum(np.abs(params_opt), 1.0)
+
+    ## Stack forward and backward perturbations as (2*n_params, n_params)
+    perturbation = np.diag(steps)
+    param_grid = np.vstack((params_opt + perturbation, params_opt - perturbation))
+
+    ## Evaluate the prediction for all perturbations in one pass
+    Yp = PredictionStatement(param_grid, StressFunction, Xi, nu)
+    Yf, Yb = Yp[:len(params_opt)], Yp[len(params_opt):]
+
+    ## Central difference for each parameter
+    jacobian = ((Yf - Yb) / (2.0 * steps[:, np.newaxis])).T
+
+    return jacobian
+
+
+def ParameterCorrelation(jacobian):
+    """ Computes the parameter correlation matrix from the sensitivity matrix,
+        using the Gauss-Newton approximation of the covariance (J^T J)^-1.
+        Entries close to +-1 indicate parameters that cannot be identified
+        independently from the data (e.g. C10 and C01).
+
+    input
+    ---------
+    jacobian: ndarray, sensitivity matrix (N, n_params)
+
+    output
+    ---------
+    correlation: ndarray, parameter correlation matrix (n_params, n_params)
+
+    """
+
+    ## Approximate covariance, pseudo-inverse for (nearly) singular fits
+    covariance = np.linalg.pinv(jacobian.T @ jacobian)
+
+    ## Normalize by the standard deviations
+    std = np.sqrt(np.abs(np.diag(covariance)))
+    std[std == 0.0] = 1.0
+    correlation = covariance / np.outer(std, std)
+
+    return correlation
@@ -0,0 +1,508 @@
+##############################################################################
+##
+## Author:      Jamie E. Simon
+##
+## Description: Local calibration service. Calibration jobs are submitted
+##              over a small HTTP API, queued and run on a pool of warm
+##              worker processes that keep the imported packages and the
+##              derived model kernels in memory between jobs.
+##
+##              Start from the repository root with
+##
+##                  python -m PythonFunctions.Service.calibration_service
+##
+##              POST /jobs       submit a job, returns {"job_id": ...}
+##              GET  /jobs/<id>  job state, result and latency
+##              GET  /status     queue depth, workers and latency statistics
+##
+##############################################################################
+
+## Import modulues
+import os
+import json
+import time
+import keyword
+import tokenize
+import uuid
+import queue
+import io
+import argparse
+import threading
+import multiprocessing
+from pathlib import Path
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+import sympy as sp
+from sympy.parsing.sympy_parser import parse_expr
+
+
+## Built-in strain energy densities in terms of I1b, I2b and detJ
+MODELS = {
+    'neo_hooke':     'C10*(I1b - 3) + (1/D)*(detJ - 1)**2',
+    'mooney_rivlin': 'C10*(I1b - 3) + C01*(I2b - 3) + (1/D)*(detJ - 1)**2',
+    'yeoh':          'C10*(I1b - 3) + C20*(I1b - 3)**2 + C30*(I1b - 3)**3 + (1/D)*(detJ - 1)**2',
+    'mooney_rivlin_c20': 'C10*(I1b - 3) + C01*(I2b - 3) + C20*(I1b - 3)**2 + (1/D)*(detJ - 1)**2',
+}
+
+## Functions allowed in a submitted strain energy density
+ENERGY_FUNCTIONS = {'exp': sp.exp, 'log': sp.log, 'sqrt': sp.sqrt,
+                    'sinh': sp.sinh, 'cosh': sp.cosh, 'tanh': sp.tanh,
+                    'atanh': sp.atanh, 'Abs': sp.Abs}
+
+## Operators allowed in a submitted strain energy density
+ENERGY_OPERATORS = {'+', '-', '*', '/', '**', '(', ')'}
+
+## Largest numeric exponent and constant power in a submitted strain energy
+## density, larger ones (e.g. 9**9**9**9) would be expanded by SymPy
+MAX_EXPONENT = 100
+MAX_CONSTANT = 1e100
+
+## VUMAT templates a job may use and the generator filling them
+VUMAT_TEMPLATES = {'VUMAT_2D_planestrain_template.f': 'closed_form',
+                   'VUMAT_3D_template.f': 'vectorized',
+                   'VUMAT_2D_planestress_template.f': 'vectorized'}
+
+## Default options of the calibration jobs
+JOB_DEFAULTS = {
+    'model': 'mooney_rivlin_c20',
+    'W': None,
+    'params': None,
+    'nu': 0.495,
+    'options': {'ftol': 10e-30, 'disp': False, 'maxiter': 3000},
+    'generate_vumat': True,
+    'template_name': 'VUMAT_2D_planestrain_template.f',
+}
+
+
+## ---------------------------- ENERGY PARSING ----------------------------- ##
+
+def ParseEnergy(W_string):
+    """ Parses a strain energy density submitted as a string without
+        evaluating arbitrary code. Only numbers, the operators in
+        ENERGY_OPERATORS, the functions in ENERGY_FUNCTIONS and plain names
+        (invariants and material parameters) are accepted.
+
+    input
+    ---------
+    W_string: str, strain energy density in terms of I1b, I2b and detJ
+
+    output
+    ---------
+    W: sympy expression
+
+    """
+
+    if not isinstance(W_string, str) or not W_string.strip() or len(W_string) > 2000:
+        raise ValueError("'W' must be a non-empty string of at most 2000 characters")
+
+    ## Check every token against the grammar
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(W_string).readline))
+    except (tokenize.TokenError, SyntaxError) as error:
+        raise ValueError(f"'W' is not a valid expression: {error}")
+    names = set()
+    for token in tokens:
+        if token.type in (tokenize.NEWLINE, tokenize.NL, tokenize.ENDMARKER):
+            continue
+        if token.type == tokenize.NUMBER and not token.string.lower().endswith('j'):
+            continue
+        if token.type == tokenize.OP and token.string in ENERGY_OPERATORS:
+            continue
+        if (token.type == tokenize.NAME and token.string.isidentifier()
+                and not token.string.startswith('_') and not keyword.iskeyword(token.string)):
+            names.add(token.string)
+            continue
+        raise ValueError(f"'W' contains the unsupported token {token.string!r}")
+
+    ## Build the expression tree with a namespace holding only the allowed
+    ## names, without evaluating it
+    symbols = {name: sp.Symbol(name) for name in names - set(ENERGY_FUNCTIONS)}
+    namespace = {'__builtins__': {}, 'Integer': sp.Integer, 'Float': sp.Float,
+                 'Rational': sp.Rational, 'Symbol': sp.Symbol, 'Add': sp.Add,
+                 'Mul': sp.Mul, 'Pow': sp.Pow, **ENERGY_FUNCTIONS}
+    try:
+        W = parse_expr(W_string, local_dict=symbols, global_dict=namespace, evaluate=False)
+    except Exception as error:
+        raise ValueError(f"'W' is not a valid expression: {error}")
+
+    ## Bound numeric exponents and constant powers, innermost first, using
+    ## floating-point evaluation so that the check itself stays cheap
+    for node in sp.postorder_traversal(W):
+        if not isinstance(node, sp.Pow):
+            continue
+        if node.exp.is_number:
+            exponent = complex(node.exp.evalf(15))
+            if not abs(exponent) <= MAX_EXPONENT:
+                raise ValueError(f"'W' contains an exponent larger than {MAX_EXPONENT}")
+        if node.is_number:
+            value = complex(node.evalf(15))
+            if not abs(value) <= MAX_CONSTANT:
+                raise ValueError(f"'W' contains a constant larger than {MAX_CONSTANT:g}")
+
+    ## Evaluate the checked expression
+    try:
+        W = parse_expr(W_string, local_dict=symbols, global_dict=namespace)
+    except Exception as error:
+        raise ValueError(f"'W' is not a valid expression: {error}")
+    if not isinstance(W, sp.Expr):
+        raise ValueError("'W' must be a scalar expression")
+
+    return W
+
+
+## ---------------------------- WORKER PROCESSES --------------------------- ##
+
+def WarmWorker(models = ()):
+    """ Initializes a worker process by importing the numerical packages and
+        deriving the kernels of the given models ahead of the first job.
+
+    input
+    ---------
+    models: list, names of models in MODELS to derive at start-up
+
+    """
+
+    ## Import the heavy packages once per process
+    import scipy.optimize
+    from ..Optimization import optimization_routines
+
+    ## Derive the kernels of the most common models
+    for model in models:
+        ModelKernels(MODELS[model], None)
+
+
+@lru_cache(maxsize=32)
+def ModelKernels(W_string, param_names):
+    """ Derives and caches the symbolic model and the numerical kernels of a
+        strain energy density. The cache lives in the worker process, so
+        repeated jobs with the same model skip the derivation.
+
+    input
+    ---------
+    W_string: str, strain energy density in terms of I1b, I2b and detJ
+
+    param_names: tuple, order of the material parameters (sorted names if None)
+
+    output
+    ---------
+    kernels: tuple, (W, params, P22_func, W_func, deriv_list, namin_list)
+
+    """
+
+    from ..StressDescription.invariant_engine import FirstPiolaKirschoffStressInvariant
+    from ..StressDescription.invariant_engine import EnergyInvariantNumerical
+
+    ## Define placeholders for modified invariants
+    I1b, I2b, J_sym = sp.symbols('I1b I2b detJ')
+
+    ## Parse the strain energy function
+    W = ParseEnergy(W_string)
+
+    ## Set the order of the material parameters
+    free = {str(s): s for s in W.free_symbols - {I1b, I2b, J_sym}}
+    if param_names is None:
+        param_names = sorted(free)
+    unknown = set(free) - set(param_names)
+    if unknown:
+        raise ValueError(f"Parameters {sorted(unknown)} of W are not listed in 'params'")
+    params = [free.get(name, sp.Symbol(name)) for name in param_names]
+
+    ## Create callable stress and energy functions
+    P22_func = FirstPiolaKirschoffStressInvariant(W, I1b, I2b, J_sym, params)
+    W_func = EnergyInvariantNumerical(W, I1b, I2b, J_sym, params)
+
+    ## Create symbolic list for the VUMAT.f file
+    deriv_list = [sp.diff(W, I1b), sp.diff(W, I2b), sp.diff(W, J_sym)]
+    namin_list = ['dWdI1', 'dWdI2', 'dWdJ']
+
+    return W, params, P22_func, W_func, deriv_list, namin_list
+
+
+def WorkerReady():
+    ## No-op task, returns once the worker has run WarmWorker
+    return os.getpid()
+
+
+def RunCalibrationJob(job_id, job, output_root):
+    """ Runs a single calibration job in a worker process.
+
+    input
+    ---------
+    job_id: str, job identifier used for the output directory
+
+    job: dict, job specification completed with JOB_DEFAULTS
+
+    output_root: str, directory of the job outputs, set by the server
+
+    output
+    ---------
+    result: dict, parameters, report and generated file paths
+
+    """
+
+    from ..Optimization.optimization_routines import PredictionStatementTension
+    from ..Optimization.optimization_routines import ObjectiveFunctionSSD
+    from ..Optimization.optimization_routines import EnergyConstraintTension
+    from ..Optimization.optimization_routines import OptimizationSLSQP
+    from ..TangentModulus.numerical_elastic_modulus import NumericalElasticModulus
+    from ..Abaqus.generate_vumat import GenerateVumatHyperelasticity
+    from ..Abaqus.generate_vumat import GenerateVumatHyperelasticityVectorized
+
+    start = time.time()
+
+    ## Load in data and set strain- and stress data
+    data = np.loadtxt(job['data_file'], delimiter=',')
+    eps_n, sig_n = data[:,0], data[:,1]
+    nu = job['nu']
+
+    ## Get the (cached) model kernels
+    W_string = job['W'] if job['W'] is not None else MODELS[job['model']]
+    param_names = tuple(job['params']) if job['params'] is not None else None
+    W, params, P22_func, W_func, deriv_list, namin_list = ModelKernels(W_string, param_names)
+    derived = time.time()
+
+    ## Construct constraints and args
+    coefs = np.ones(len(params))
+    constraints = ({'type': 'ineq', 'fun': lambda p: EnergyConstraintTension(p, W_func, eps_n, nu = nu)})
+    args = (PredictionStatementTension, P22_func, eps_n, sig_n, nu)
+
+    ## Conduct optimization and get best parameters
+    model_coef_opt, obj_hist, _ = OptimizationSLSQP(ObjectiveFunctionSSD, coefs, args,
+                                                    constraints = constraints,
+                                                    options = job['options'])
+
+    ## Compute elastic modulus, based on prediction statement
+    E_elastic = NumericalElasticModulus(eps_n, PredictionStatementTension,
+                                        P22_func, model_coef_opt, nu)
+
+    ## Build report
+    output_dir = Path(output_root) / job_id
+    output_dir.mkdir(parents=True, exist_ok=True)
+    param_names = [str(param) for param in params]
+    report = {'W': str(W),
+              'parameters': dict(zip(param_names, model_coef_opt.tolist())),
+              'E': float(E_elastic),
+              'nu': nu,
+              'objective': float(ObjectiveFunctionSSD(model_coef_opt, *args)),
+              'iterations': len(obj_hist)}
+
+    ## Generate VUMAT fortran file
+    vumat_path = None
+    if job['generate_vumat']:
+        output_name = job['template_name'].split('_template.f')[0] + "_modified.f"
+        if VUMAT_TEMPLATES[job['template_name']] == 'vectorized':
+            vumat_path = GenerateVumatHyperelasticityVectorized(W, param_names + ['E', 'nu'],
+                                                                deriv_list, namin_list,
+                                                                sp.symbols('I1b I2b detJ'),
+                                                                template_name = job['template_name'],
+                                                                output_path = output_dir / output_name)
+        else:
+            vumat_path = GenerateVumatHyperelasticity(W, param_names + ['E', 'nu'],
+                                                      deriv_list, namin_list,
+                                                      template_name = job['template_name'],
+                                                      output_path = output_dir / output_name)
+        vumat_path = str(vumat_path)
+
+    ## Save report
+    report_path = output_dir / 'report.json'
+    with report_path.open('w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    return {'report': report,
+            'report_path': str(report_path),
+            'vumat_path': vumat_path,
+            'started': start,
+            'derive_time': derived - start,
+            'run_time': time.time() - start}
+
+
+## ---------------------------- SERVICE ------------------------------------ ##
+
+class CalibrationService:
+    """ Queues calibration jobs and dispatches them to warm workers.
+
+    input
+    ---------
+    workers: int, number of worker processes
+
+    warm_models: list, models in MODELS derived when the workers start
+
+    output_root: str, directory of the job outputs, not settable by clients
+
+    """
+
+    def __init__(self, workers = 2, warm_models = ('mooney_rivlin_c20',),
+                 output_root = 'output//jobs'):
+        self.workers = workers
+        self.output_root = output_root
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.slots = threading.Semaphore(workers)
+
+        ## Spawned workers do not inherit the threads of the server
+        self.executor = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=WarmWorker,
+                                            initargs=(tuple(warm_models),))
+
+        ## Processes start on demand, start and warm all of them now so that
+        ## the first jobs do not pay for the start-up
+        ready = [self.executor.submit(WorkerReady) for _ in range(workers)]
+        self.worker_pids = sorted({future.result() for future in ready})
+
+        ## Dispatcher handing queued jobs to free workers
+        self.dispatcher = threading.Thread(target=self.dispatch, daemon=True)
+        self.dispatcher.start()
+
+    def submit(self, job):
+        ## Complete and validate the job specification
+        unknown = set(job) - set(JOB_DEFAULTS) - {'data_file'}
+        if 'data_file' not in job:
+            raise ValueError("Job requires a 'data_file'")
+        if unknown:
+            raise ValueError(f"Unknown job options: {sorted(unknown)}")
+        if job.get('W') is None and job.get('model', JOB_DEFAULTS['model']) not in MODELS:
+            raise ValueError(f"Unknown model, choose one of {sorted(MODELS)} or pass 'W'")
+        job = {**JOB_DEFAULTS, **job}
+        if job['template_name'] not in VUMAT_TEMPLATES:
+            raise ValueError(f"Unknown template, choose one of {sorted(VUMAT_TEMPLATES)}")
+        if job['params'] is not None and not (
+                isinstance(job['params'], list)
+                and all(isinstance(name, str) and name.isidentifier() for name in job['params'])):
+            raise ValueError("'params' must be a list of parameter names")
+
+        ## Parse a custom strain energy before it reaches a worker
+        if job['W'] is not None:
+            ParseEnergy(job['W'])
+
+        ## Register and queue the job
+        job_id = uuid.uuid4().hex[:12]
+        with self.lock:
+            self.jobs[job_id] = {'state': 'queued', 'job': job,
+                                 'submitted': time.time()}
+        self.queue.put(job_id)
+        return job_id
+
+    def dispatch(self):
+        while True:
+            ## Wait for a free worker, then for a job
+            self.slots.acquire()
+            job_id = self.queue.get()
+            with self.lock:
+                entry = self.jobs[job_id]
+                entry['state'] = 'running'
+                entry['dispatched'] = time.time()
+            future = self.executor.submit(RunCalibrationJob, job_id, entry['job'], self.output_root)
+            future.add_done_callback(lambda f, job_id=job_id: self.finish(job_id, f))
+
+    def finish(self, job_id, future):
+        ## Store the result or error and release the worker slot
+        with self.lock:
+            entry = self.jobs[job_id]
+            entry['finished'] = time.time()
+            entry['latency'] = entry['finished'] - entry['submitted']
+            try:
+                entry['result'] = future.result()
+                entry['state'] = 'done'
+            except Exception as error:
+                entry['error'] = f"{type(error).__name__}: {error}"
+                entry['state'] = 'failed'
+        self.slots.release()
+
+    def job_status(self, job_id):
+        with self.lock:
+            entry = self.jobs.get(job_id)
+            if entry is None:
+                return None
+            return {key: value for key, value in entry.items() if key != 'job'}
+
+    def status(self):
+        ## Queue depth and latency statistics
+        with self.lock:
+            states = [entry['state'] for entry in self.jobs.values()]
+            latency = [entry['latency'] for entry in self.jobs.values() if 'latency' in entry]
+        return {'workers': self.workers,
+                'queue_depth': self.queue.qsize(),
+                'queued': states.count('queued'),
+                'running': states.count('running'),
+                'done': states.count('done'),
+                'failed': states.count('failed'),
+                'latency_mean': float(np.mean(latency)) if latency else None,
+                'latency_max': float(np.max(latency)) if latency else None}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def ServiceHandler(service):
+    """ Creates the HTTP request handler bound to a CalibrationService. """
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def send_json(self, code, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path != '/jobs':
+                return self.send_json(404, {'error': 'not found'})
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                job = json.loads(self.rfile.read(length) or b'{}')
+                job_id = service.submit(job)
+            except (ValueError, TypeError) as error:
+                return self.send_json(400, {'error': str(error)})
+            return self.send_json(202, {'job_id': job_id})
+
+        def do_GET(self):
+            if self.path == '/status':
+                return self.send_json(200, service.status())
+            if self.path.startswith('/jobs/'):
+                entry = service.job_status(self.path[len('/jobs/'):])
+                if entry is None:
+                    return self.send_json(404, {'error': 'unknown job'})
+                return self.send_json(200, entry)
+            return self.send_json(404, {'error': 'not found'})
+
+        def log_message(self, format, *args):
+            return
+
+    return Handler
+
+
+def RunService(host = '127.0.0.1', port = 8765, workers = 2,
+               warm_models = ('mooney_rivlin_c20',), output_root = 'output//jobs'):
+    ## Start the workers and serve until interrupted
+    service = CalibrationService(workers = workers, warm_models = warm_models,
+                                 output_root = output_root)
+    server = ThreadingHTTPServer((host, port), ServiceHandler(service))
+    print(f'Calibration service listening on http://{host}:{port} with {workers} workers')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local hippoelasto calibration service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--warm-models', nargs='*', default=['mooney_rivlin_c20'],
+                        choices=sorted(MODELS))
+    parser.add_argument('--output-dir', default='output//jobs',
+                        help='directory of the job outputs')
+    arguments = parser.parse_args()
+    RunService(arguments.host, arguments.port, arguments.workers, arguments.warm_models,
+               arguments.output_dir)
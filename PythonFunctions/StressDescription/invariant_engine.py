@@ -0,0 +1,173 @@
+##############################################################################
+##
+## Author:      Jamie E. Simon
+##
+## Description: Invariant-space evaluation of the stress and energy. W is
+##              differentiated symbolically only with respect to (I1b, I2b, J)
+##              and combined numerically with the closed-form derivatives of
+##              the invariants, so the stretch expressions are never
+##              substituted into W.
+##
+##############################################################################
+
+
+## Import packages
+import numpy as np
+import sympy as sp
+from sympy import lambdify
+from ..StretchDescription.stretches_invariants import InvariantsNumerical
+
+
+def InvariantDerivatives(Wi,
+                         I1b, I2b, Jac,
+                         params):
+    """ This module differentiates the strain energy density with respect
+        to the modified invariants and the jacobian and creates a callable
+        for their numerical evaluation.
+
+    input
+    ---------
+    Wi:  sympy, strain energy density [J]
+
+    I1b: sympy, 1. modified invariant [-]
+
+    I2b: sympy, 2. modified invariant [-]
+
+    Jac: sympy, jacobian determinant of the deformation gradient tensor [-]
+
+    params: list, sympy symbols of the material parameters
+
+    output
+    ---------
+    dW_func: callable, dW_func(I1b, I2b, J, *params) -> [dWdI1b, dWdI2b, dWdJ]
+
+    """
+
+    ## Replace float literals by exact rationals where possible
+    Wi = sp.nsimplify(Wi, rational=True)
+
+    ## Derivative of W with respect to the modified invariants and jacobian
+    dWdI1b = sp.diff(Wi, I1b)
+    dWdI2b = sp.diff(Wi, I2b)
+    dWdJ   = sp.diff(Wi, Jac)
+
+    ## Create function statement for evaluation
+    dW_func = lambdify([I1b, I2b, Jac] + list(params),
+                       [dWdI1b, dWdI2b, dWdJ], modules='numpy')
+
+    return dW_func
+
+
+def FirstPiolaKirschoffStressInvariant(Wi,
+                                       I1b, I2b, Jac,
+                                       params,
+                                       incompressible = False):
+    """ This module computes the first Piola-Kirschoff stress under the
+        assumption of uniaxial tension by evaluating the invariant
+        derivatives of W numerically. It is a drop-in alternative to
+        lambdifying FirstPiolaKirschoffStress (or its incompressible
+        counterpart) with the stretches and params as arguments.
+
+    input
+    ---------
+    Wi:  sympy, strain energy density [J]
+
+    I1b: sympy, 1. modified invariant [-]
+
+    I2b: sympy, 2. modified invariant [-]
+
+    Jac: sympy, jacobian determinant of the deformation gradient tensor [-]
+
+    params: list, sympy symbols of the material parameters
+
+    incompressible: bool, use the Lagrange multiplier from P33 = 0
+
+    output
+    ---------
+    P22_func: callable, P22_func(L11, L22, L33, *params) -> P22 [MPa]
+
+    """
+
+    ## Get the numerical derivatives of W
+    dW_func = InvariantDerivatives(Wi, I1b, I2b, Jac, params)
+
+    return StressFromInvariantDerivatives(dW_func, incompressible = incompressible)
+
+
+def StressFromInvariantDerivatives(dW_func, incompressible = False):
+    """ This module combines numerically evaluated derivatives of W with
+        respect to the invariants with the closed-form derivatives of the
+        invariants with respect to the stretches (uniaxial tension).
+
+    input
+    ---------
+    dW_func: callable, dW_func(I1b, I2b, J, *params) -> [dWdI1b, dWdI2b, dWdJ]
+
+    incompressible: bool, use the Lagrange multiplier from P33 = 0
+
+    output
+    ---------
+    P22_func: callable, P22_func(L11, L22, L33, *params) -> P22 [MPa]
+
+    """
+
+    def P22_func(L11, L22, L33, *param_values):
+        ## Get the invariants and their derivatives
+        I1b_n, I2b_n, Jac_n, dL22, dL33 = InvariantsNumerical(L11, L22, L33)
+
+        ## Evaluate the derivatives of W at the invariants
+        dWdI1b, dWdI2b, dWdJ = dW_func(I1b_n, I2b_n, Jac_n, *param_values)
+
+        ## Compute the deviatoric stress using the chain rule
+        P22 = dWdI1b * dL22[0] + dWdI2b * dL22[1]
+
+        if incompressible:
+            ## Lagrangian multiplier derived from P33_vol = 0.0
+            P22 = P22 - (dWdI1b * dL33[0] + dWdI2b * dL33[1])
+        else:
+            ## Add the volumetric stress
+            P22 = P22 + dWdJ * dL22[2]
+
+        return P22
+
+    return P22_func
+
+
+def EnergyInvariantNumerical(Wi,
+                             I1b, I2b, Jac,
+                             params):
+    """ This module creates a callable of the strain energy density that
+        evaluates W at numerically computed invariants. It is a drop-in
+        alternative to lambdifying EnergyInvariantModified.
+
+    input
+    ---------
+    Wi:  sympy, strain energy density [J]
+
+    I1b: sympy, 1. modified invariant [-]
+
+    I2b: sympy, 2. modified invariant [-]
+
+    Jac: sympy, jacobian determinant of the deformation gradient tensor [-]
+
+    params: list, sympy symbols of the material parameters
+
+    output
+    ---------
+    W_func: callable, W_func(L11, L22, L33, *params) -> W [J]
+
+    """
+
+    ## Create function statement for evaluation
+    W_inv = lambdify([I1b, I2b, Jac] + list(params),
+                     sp.nsimplify(Wi, rational=True), modules='numpy')
+
+    def W_func(L11, L22, L33, *param_values):
+        ## Get the invariants
+        I1b_n, I2b_n, Jac_n, _, _ = InvariantsNumerical(L11, L22, L33)
+
+        ## Evaluate the energy at the invariants, expanded to the stretch
+        ## shape for energies that are constant in the invariants
+        return W_inv(I1b_n, I2b_n, Jac_n, *param_values) + np.zeros_like(I1b_n)
+
+    return W_func
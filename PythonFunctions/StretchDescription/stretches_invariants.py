@@ -6,6 +6,10 @@
 ##              
 ##############################################################################
 
+## Import packages
+import numpy as np
+import sympy as sp
+
 
 def Invariants(L11,L22,L33):
     """ This module computes the first and second invariants and modified
@@ -37,8 +41,67 @@ def Invariants(L11,L22,L33):
     I1_expr = L11**2 + L22**2 + L33**2
     I2_expr = L11**2 * L22**2 + L22**2 * L33**2 + L33**2 * L11**2
     
+    ## Compute modified invariants, exact rational exponents keep the
+    ## expressions simplifiable
+    I1b_expr = Jac_expr**sp.Rational(-2,3) * I1_expr
+    I2b_expr = Jac_expr**sp.Rational(-4,3) * I2_expr
+    
+    return I1b_expr, I2b_expr, Jac_expr
+
+
+def InvariantsNumerical(L11,L22,L33):
+    """ This module computes the modified invariants, the jacobian and their
+        closed-form derivatives with respect to the 2. and 3. stretch
+        numerically from stretch arrays.
+        
+    input
+    ---------
+    L11:  numpy, 1. stretch [-]
+    
+    L22:  numpy, 2. stretch [-]
+    
+    L33:  numpy, 3. stretch [-]
+        
+    output
+    ---------
+    I1b:  numpy, 1. modified invariant [-]
+    
+    I2b:  numpy, 2. modified invariant [-]
+    
+    Jac:  numpy, jacobian determinant of the deformation gradient tensor [-]
+    
+    dL22: tuple, (dI1b/dL22, dI2b/dL22, dJ/dL22) [-]
+    
+    dL33: tuple, (dI1b/dL33, dI2b/dL33, dJ/dL33) [-]
+    
+    """
+    
+    ## Compute squared stretches
+    L11s, L22s, L33s = L11**2, L22**2, L33**2
+    
+    ## Compute the determinant J (volume change)
+    Jac = L11 * L22 * L33
+    
+    ## Compute invariants
+    I1 = L11s + L22s + L33s
+    I2 = L11s * L22s + L22s * L33s + L33s * L11s
+    
     ## Compute modified invariants
-    I1b_expr = Jac_expr**(-2/3) * I1_expr
-    I2b_expr = Jac_expr**(-4/3) * I2_expr
+    J23 = np.cbrt(Jac)**(-2)
+    J43 = J23**2
+    I1b = J23 * I1
+    I2b = J43 * I2
+    
+    ## Derivatives with respect to a stretch L, using dJ/dL = J/L:
+    ## dI1b/dL = J^(-2/3) * (dI1/dL - 2/3 * I1/L)
+    ## dI2b/dL = J^(-4/3) * (dI2/dL - 4/3 * I2/L)
+    dI1bdL22 = J23 * (2.0 * L22 - (2.0 / 3.0) * I1 / L22)
+    dI2bdL22 = J43 * (2.0 * L22 * (L11s + L33s) - (4.0 / 3.0) * I2 / L22)
+    dI1bdL33 = J23 * (2.0 * L33 - (2.0 / 3.0) * I1 / L33)
+    dI2bdL33 = J43 * (2.0 * L33 * (L11s + L22s) - (4.0 / 3.0) * I2 / L33)
+    
+    ## Derivative of the jacobian with respect to the stretches
+    dJdL22 = L11 * L33
+    dJdL33 = L11 * L22
     
-    return I1b_expr, I2b_expr, Jac_expr
\ No newline at end of file
+    return I1b, I2b, Jac, (dI1bdL22, dI2bdL22, dJdL22), (dI1bdL33, dI2bdL33, dJdL33)
\ No newline at end of file
@@ -0,0 +1,162 @@
+##############################################################################
+##
+## Author:      Jamie E. Simon
+##
+## Description: Visco-hyperelastic (quasi-linear viscoelastic) extension of
+##              the hyperelastic stress with a normalized Prony series
+##
+##                  G(t) = g_inf + sum_i g_i exp(-t/tau_i),  g_inf = 1 - sum_i g_i
+##
+##              The hereditary integral is evaluated with the recursive
+##              exponential update, linear in the number of time steps and
+##              vectorized over the Prony terms.
+##
+##############################################################################
+
+## Import modulues
+import numpy as np
+from ..Optimization.optimization_routines import PredictionStatementTension
+
+
+def PronyRelaxation(Pe, Ti, g, tau):
+    """ Computes the viscoelastic stress from the instantaneous (elastic)
+        stress history with the recursive update of the internal variables
+
+            h_i(n+1) = exp(-dt/tau_i) h_i(n) + g_i (1 - exp(-dt/tau_i)) tau_i/dt (Pe(n+1) - Pe(n))
+
+        assuming a linear variation of Pe within each time step.
+
+    input
+    ---------
+    Pe: ndarray, instantaneous stress history [MPa] (N,)
+
+    Ti: ndarray, time [s] (N,)
+
+    g: ndarray, Prony coefficients [-] (n_prony,)
+
+    tau: ndarray, Prony relaxation times [s] (n_prony,)
+
+    output
+    ---------
+    P: ndarray, viscoelastic stress history [MPa] (N,)
+
+    """
+
+    ## Convert inputs
+    Pe = np.asarray(Pe, dtype=float)
+    g, tau = np.asarray(g, dtype=float), np.asarray(tau, dtype=float)
+
+    ## Decay factors and step weights for all steps and terms, (N-1, n_prony).
+    ## The weight (1 - exp(-x))/x tends to 1 for vanishing time steps
+    x = np.diff(np.asarray(Ti, dtype=float))[:,np.newaxis] / tau[np.newaxis,:]
+    decay = np.exp(-x)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = np.where(x > 0.0, -np.expm1(-x) / x, 1.0)
+    weight = g * weight * np.diff(Pe)[:,np.newaxis]
+
+    ## Recursive update of the internal variables, starting from rest
+    h = np.zeros((len(Pe), len(g)))
+    h[0] = g * Pe[0]
+    for n in range(len(Pe) - 1):
+        h[n+1] = decay[n] * h[n] + weight[n]
+
+    ## Long-term elastic part plus the internal variables
+    return (1.0 - np.sum(g)) * Pe + np.sum(h, axis=1)
+
+
+def SplitViscoParameters(params, n_prony):
+    ## Hyperelastic parameters followed by g_1..g_n and tau_1..tau_n
+    params = np.asarray(params, dtype=float)
+    n_hyper = len(params) - 2*n_prony
+    return params[:n_hyper], params[n_hyper:n_hyper+n_prony], params[n_hyper+n_prony:]
+
+
+def PredictionStatementViscoTension(params, StressFunction, Xi, Ti, n_prony, nu = 0.5):
+    ## Split hyperelastic and Prony parameters
+    params_hyper, g, tau = SplitViscoParameters(params, n_prony)
+    ## Compute the instantaneous hyperelastic stress history
+    Pe = PredictionStatementTension(params_hyper, StressFunction, Xi, nu = nu)
+    Pe = np.broadcast_to(Pe, np.shape(Xi))
+    ## Apply the hereditary integral
+    Ypred = PronyRelaxation(Pe, Ti, g, tau)
+    return Ypred
+
+
+def ObjectiveFunctionViscoSSD(params, PredictionStatement_i, StressFunction_i,
+                              Xi, Ti, Yi, n_prony, nu = 0.5):
+    """ Mean of squared differences for one or several (e.g. multi-rate or
+        relaxation) tests, fitting hyperelastic and Prony parameters jointly.
+
+    input
+    ---------
+    params: array_like, hyperelastic parameters, g_1..g_n, tau_1..tau_n
+
+    PredictionStatement_i: callable, e.g. PredictionStatementViscoTension
+
+    StressFunction_i: callable, stress function of the stretches and params
+
+    Xi: ndarray or list of ndarrays, strain histories [-]
+
+    Ti: ndarray or list of ndarrays, time [s]
+
+    Yi: ndarray or list of ndarrays, stress histories [MPa]
+
+    n_prony: int, number of Prony terms
+
+    nu: float, poisson's ratio [-]
+
+    output
+    ---------
+    SSD: float, objective summed over the tests
+
+    """
+
+    ## A single test is treated as a list with one entry
+    if isinstance(Xi, np.ndarray):
+        Xi, Ti, Yi = [Xi], [Ti], [Yi]
+
+    SSD = 0.0
+    for X, T, Y in zip(Xi, Ti, Yi):
+        ## Compute prediction statement
+        Yj = PredictionStatement_i(params, StressFunction_i, X, T, n_prony, nu = nu)
+        ## Compute sum of squared differences
+        SSD += (1/len(Y))*np.sum((Yj-Y)**2)
+    return SSD
+
+
+def PronyConstraints(n_params, n_prony, tau_min = 1e-6):
+    """ Inequality constraints for SLSQP keeping the Prony series admissible:
+        g_i >= 0, sum_i g_i <= 1 and tau_i >= tau_min.
+
+    input
+    ---------
+    n_params: int, total number of parameters
+
+    n_prony: int, number of Prony terms
+
+    tau_min: float, smallest admissible relaxation time [s]
+
+    output
+    ---------
+    constraints: list, SLSQP constraint dictionaries
+
+    """
+
+    n_hyper = n_params - 2*n_prony
+    g_slice = slice(n_hyper, n_hyper + n_prony)
+    tau_slice = slice(n_hyper + n_prony, n_params)
+
+    return [{'type': 'ineq', 'fun': lambda params: params[g_slice]},
+            {'type': 'ineq', 'fun': lambda params: 1.0 - np.sum(params[g_slice])},
+            {'type': 'ineq', 'fun': lambda params: params[tau_slice] - tau_min}]
+
+
+def PronyInitialGuess(Ti, n_prony, g_total = 0.5):
+    ## Relaxation times spread logarithmically over the time range of the test
+    Ti = np.concatenate([np.ravel(T) for T in Ti]) if isinstance(Ti, list) else np.ravel(Ti)
+    dt = np.diff(np.unique(Ti))
+    t_min = np.min(dt[dt > 0]) if np.any(dt > 0) else 1.0
+    t_max = max(np.max(Ti) - np.min(Ti), 10*t_min)
+    tau = np.logspace(np.log10(t_min), np.log10(t_max), num=n_prony)
+    g = np.full(n_prony, g_total / n_prony)
+    return np.concatenate((g, tau))
@@ -7,30 +7,41 @@
 ##############################################################################
 
 ## Load in modules
-import numpy as np
 import sympy as sp
-from sympy import lambdify
-from PythonFunctions.StressDescription.piola_kirschoff_stress import FirstPiolaKirschoffStress
-from PythonFunctions.EnergyDescription.energy_substitution import EnergyInvariantModified
-from PythonFunctions.Abaqus.generate_vumat import GenerateVumatHyperelasticity
-from PythonFunctions.Optimization.optimization_routines import PredictionStatementTension
-from PythonFunctions.Optimization.optimization_routines import ObjectiveFunctionSSD
-from PythonFunctions.Optimization.optimization_routines import EnergyConstraintTension
-from PythonFunctions.Optimization.optimization_routines import OptimizationSLSQP
-from PythonFunctions.PlottingFunctions.plotting_functions import plotStressStrainCurve
-from PythonFunctions.PlottingFunctions.plotting_functions import plotTangenmodulus
-from PythonFunctions.PlottingFunctions.plotting_functions import saveMaterialParameters
-from PythonFunctions.PlottingFunctions.plotting_functions import plotOptimizationHistory
-from PythonFunctions.TangentModulus.numerical_elastic_modulus import NumericalElasticModulus
+from PythonFunctions.Pipeline.pipeline_runner import PipelineRunner
+from PythonFunctions.Pipeline.pipeline_runner import FileInput
+from PythonFunctions.Pipeline.calibration_stages import StageLoadData
+from PythonFunctions.Pipeline.calibration_stages import StageDerive
+from PythonFunctions.Pipeline.calibration_stages import StageFit
+from PythonFunctions.Pipeline.calibration_stages import StageModulus
+from PythonFunctions.Pipeline.calibration_stages import StageLandscape
+from PythonFunctions.Pipeline.calibration_stages import StageVumat
+from PythonFunctions.Pipeline.calibration_stages import StageVumatVectorized
+from PythonFunctions.Pipeline.calibration_stages import StageOutput
 
 
 ## ------------------------------ DATA INPUT ------------------------------ ##
 
-# Load in data
-data = np.loadtxt('data\\nominal_stress_strain_data.txt',delimiter=',')
+# Set data file, its content hash decides whether the data is reloaded
+data_file = FileInput('data\\nominal_stress_strain_data.txt')
+
+# Set VUMAT templates
+template_file = FileInput('PythonFunctions\\Abaqus\\templates\\VUMAT_2D_planestrain_template.f')
+template_file_3D = FileInput('PythonFunctions\\Abaqus\\templates\\VUMAT_3D_template.f')
+template_file_PS = FileInput('PythonFunctions\\Abaqus\\templates\\VUMAT_2D_planestress_template.f')
 
-# Set strain- and stress data
-eps_n, sig_n = data[:,0], data[:,1]
+# Set solver options
+solver_options = {'ftol': 10e-30, 'disp': True, 'maxiter': 3000}
+
+# Set plot options, changing them only reruns the output stage
+plot_options = {'stress_strain':        {'fontsize_plot': 16, 'markersize_plot': 12,
+                                         'labelsize_plot': 15, 'linewidth_plot': 5},
+                'tangent_modulus':      {'fontsize_plot': 16, 'markersize_plot': 12,
+                                         'labelsize_plot': 15, 'linewidth_plot': 5},
+                'optimization_history': {'fontsize_plot': 16, 'markersize_plot': 10,
+                                         'labelsize_plot': 15, 'linewidth_plot': 5},
+                'objective_landscape':  {'fontsize_plot': 16, 'labelsize_plot': 15,
+                                         'levels_plot': 30}}
 
 ## ----------------------- STRAIN ENERGY DEFINITION ----------------------- ##
 
@@ -60,69 +71,77 @@ symbolic_namin_list = ['dWdI1','dWdI2', 'dWdJ']
 symbolic_mater_list = [str(param) for param in symbolic_param_list] + ['E', 'nu']
 
 ## ------------------------------ MAIN FUNCTION ---------------------------- ##
-        
-# Get the stress function
-P22_total = FirstPiolaKirschoffStress(W,I1b,I2b,J_sym,lambda_11,lambda_22,lambda_33)
-
-# Get the modified energy-formulation
-W_modified = EnergyInvariantModified(W,I1b,I2b,J_sym,lambda_11,lambda_22,lambda_33)
 
-# Create function statement for evaluation
-P22_func = lambdify(symbolic_combi_list,P22_total,modules='numpy')
+# Set the pipeline, stages are skipped when their inputs are unchanged
+pipeline = PipelineRunner(store_path = 'output//artifacts')
 
-# Get the modified energy-formulation
-W_func = lambdify(symbolic_combi_list,W_modified,modules='numpy')
- 
-# Initial guess
-coefs = np.ones(len(symbolic_combi_list[3:]))
-
-# Construct constraints
-constraints = ({'type': 'ineq', 'fun': lambda params: EnergyConstraintTension(params, W_func, eps_n, nu = nu)})
+# Load in data
+pipeline.add_stage('load', StageLoadData, inputs = {'data_file': data_file})
 
-# Construct args
-args = (PredictionStatementTension, P22_func, eps_n, sig_n, nu)
+# Get the stress function and the modified energy-formulation
+pipeline.add_stage('derive', StageDerive,
+                   inputs = {'W': W, 'I1b': I1b, 'I2b': I2b, 'J_sym': J_sym,
+                             'stretches': (lambda_11, lambda_22, lambda_33)})
 
 # Conduct optimization and get best parameters
-model_coef_opt, obj_hist, param_hist = OptimizationSLSQP(ObjectiveFunctionSSD, coefs, args, constraints = constraints)
-
-print('The optimization parameters are: ')
-print(model_coef_opt)
+pipeline.add_stage('fit', StageFit,
+                   inputs = {'symbolic_combi_list': symbolic_combi_list,
+                             'nu': nu, 'options': solver_options},
+                   depends = ['load', 'derive'])
 
 # Compute elastic modulus, based on prediction statement
-E_elastic = NumericalElasticModulus(eps_n,
-                                    PredictionStatementTension, 
-                                    P22_func, model_coef_opt, nu)
-
-# Build material output list
-material_output_list = list(model_coef_opt) + [E_elastic, nu]
+pipeline.add_stage('modulus', StageModulus,
+                   inputs = {'symbolic_combi_list': symbolic_combi_list, 'nu': nu},
+                   depends = ['load', 'derive', 'fit'])
 
+# Sensitivity and objective landscape of C10 and C01 around the optimum
+pipeline.add_stage('landscape', StageLandscape,
+                   inputs = {'symbolic_combi_list': symbolic_combi_list, 'nu': nu},
+                   depends = ['load', 'derive', 'fit'])
 
 ## --------------------------- GENERATE VUMAT ------------------------------ ##
 
 # % Generate VUMAT fortran file
-GenerateVumatHyperelasticity(W,
-                          symbolic_mater_list,
-                          symbolic_deriv_list,
-                          symbolic_namin_list,
-                          template_name = 'VUMAT_2D_planestrain_template.f')
-
+pipeline.add_stage('vumat', StageVumat,
+                   inputs = {'W': W,
+                             'symbolic_mater_list': symbolic_mater_list,
+                             'symbolic_deriv_list': symbolic_deriv_list,
+                             'symbolic_namin_list': symbolic_namin_list,
+                             'template_file': template_file},
+                   output_files = ['output\\VUMAT_2D_planestrain_modified.f'])
+
+# % Generate block-vectorized 3D solid and plane stress VUMAT fortran files
+for stage_name, vumat_template in (('vumat_3d', template_file_3D), ('vumat_ps', template_file_PS)):
+    pipeline.add_stage(stage_name, StageVumatVectorized,
+                       inputs = {'W': W,
+                                 'symbolic_mater_list': symbolic_mater_list,
+                                 'symbolic_deriv_list': symbolic_deriv_list,
+                                 'symbolic_namin_list': symbolic_namin_list,
+                                 'invariant_symbols': (I1b, I2b, J_sym),
+                                 'template_file': vumat_template},
+                       output_files = ['output\\' + vumat_template.path.name.replace('_template.f', '_modified.f')])
 
 ## --------------------------- SAVE TO OUTPUT ------------------------------ ##
 
-# Make artifical X-range
-eps_p = np.linspace(np.min(eps_n)-np.min(eps_n)/10,np.max(eps_n)+np.min(eps_n)/10,num=50,endpoint = True)
-
-# Compute prediction statement
-sig_p = PredictionStatementTension(model_coef_opt, P22_func, eps_p, nu)
+# Plot stress strain curve, tangent modulus, optimization history, landscape
+# and save material-parameters
+pipeline.add_stage('output', StageOutput,
+                   inputs = {'symbolic_combi_list': symbolic_combi_list,
+                             'symbolic_param_list': symbolic_param_list,
+                             'symbolic_mater_list': symbolic_mater_list,
+                             'nu': nu, 'plot_options': plot_options},
+                   depends = ['load', 'derive', 'fit', 'modulus', 'landscape'],
+                   output_files = ['output//predictionvsdata.pdf',
+                                   'output//tangentmodulus.pdf',
+                                   'output//optimizationhistory.pdf',
+                                   'output//objectivelandscape.pdf',
+                                   'output/model_parameters.pdf'])
+
+# Run all stages
+results = pipeline.run()
 
-# Plot stress strain curve and save to output
-plotStressStrainCurve(eps_n,sig_n,eps_p,sig_p)
-
-# Plot tangent modulus and save to output
-plotTangenmodulus(eps_p,sig_p, E_elastic)
-
-# Plot optimization history
-plotOptimizationHistory(obj_hist,param_hist,symbolic_param_list)
+print('The optimization parameters are: ')
+print(results['fit'][0])
 
-# Save material-parameters
-saveMaterialParameters(symbolic_mater_list,material_output_list)
\ No newline at end of file
+print('The parameter correlation matrix is: ')
+print(results['landscape'][0])
\ No newline at end of file